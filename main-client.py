@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""
+Audio Tools - Cliente del Daemon
+================================
+Reenvía los argumentos al daemon iniciado con `python main.py --daemon`,
+que ya tiene las herramientas importadas. Si no hay daemon activo, ejecuta
+main.py en este mismo proceso.
+
+Uso:
+    python main-client.py <herramienta> [args]
+"""
+
+import sys
+
+from tools._daemon import ejecutar_remoto
+
+
+def main():
+    """Punto de entrada del cliente."""
+    # El menú interactivo necesita la terminal del cliente: siempre local
+    rc = ejecutar_remoto(sys.argv[1:]) if len(sys.argv) >= 2 else None
+    if rc is None:
+        import main as audio_tools
+        
+        return audio_tools.main()
+    return rc
+
+
+if __name__ == "__main__":
+    sys.exit(main())
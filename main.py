@@ -7,6 +7,7 @@ Dispatcher central para herramientas de procesamiento de audio.
 Uso:
     python main.py                           # Menú interactivo
     python main.py <herramienta> [args]      # Uso directo
+    python main.py --daemon                  # Daemon persistente (ver main-client.py)
 
 Ejemplos:
     python main.py delay-fix input.flac
@@ -14,112 +15,110 @@ Ejemplos:
 """
 
 import sys
-import importlib
-from pathlib import Path
 
 # Registro de herramientas - agregar nuevas herramientas aquí
-TOOLS = {
-    "delay-fix": {
-        "module": "tools.delay_fix",
-        "description": "Analiza audio y aplica correcciones de delay"
-    },
+# Una fila por herramienta: (nombre, módulo, descripción)
+_REGISTRY = (
+    ("delay-fix", "tools.delay_fix", "Analiza audio y aplica correcciones de delay"),
     # Herramientas futuras se agregan aquí:
-    # "fps-fix": {
-    #     "module": "tools.fps_fix",
-    #     "description": "Corrige problemas de FPS en audio"
-    # },
-}
+    # ("fps-fix", "tools.fps_fix", "Corrige problemas de FPS en audio"),
+)
+
+# Tuplas paralelas derivadas del registro (la posición i es la misma herramienta)
+_TOOL_NAMES, _TOOL_MODULES, _TOOL_DESCS = zip(*_REGISTRY)
+# Nombres internados: las búsquedas con argv internado comparan por identidad
+_TOOL_NAMES = tuple(map(sys.intern, _TOOL_NAMES))
+_TOOL_INDEX = {name: i for i, name in enumerate(_TOOL_NAMES)}
+
+_HELP_ALIASES = frozenset(map(sys.intern, ("--help", "-h", "help", "ayuda")))
+
+# Cuerpo de --help (todo salvo el banner), formateado una vez al importar
+_HELP_BODY = "\n".join((
+    "",
+    "Uso:",
+    "  python main.py                    Menú interactivo",
+    "  python main.py <herramienta>      Ejecutar herramienta",
+    "  python main.py --daemon           Iniciar daemon (clientes: main-client.py)",
+    "",
+    "Herramientas disponibles:",
+    *(f"  {name:<15} {desc}" for name, desc in zip(_TOOL_NAMES, _TOOL_DESCS)),
+)) + "\n"
+
+
+# Proxy perezoso por herramienta (índice -> módulo), creado en el primer uso
+_TOOL_PROXIES = {}
+
+
+def _resolve_tool(idx):
+    """
+    Resuelve la función main() de la herramienta una sola vez por proceso.
+    El resultado queda guardado como __resolved_main__ en el proxy perezoso
+    de _TOOL_PROXIES (no en el módulo real); False marca un módulo sin
+    main() para no volver a buscarla.
+    """
+    module = _TOOL_PROXIES.get(idx)
+    if module is None:
+        from tools import lazy_import
+        
+        # Proxy perezoso: el módulo real se importa en el primer acceso a atributo
+        module = _TOOL_PROXIES[idx] = lazy_import(_TOOL_MODULES[idx])
+    
+    fn = getattr(module, "__resolved_main__", None)
+    if fn is None:
+        fn = getattr(module, "main", None)
+        module.__resolved_main__ = fn or False
+    return fn or None
 
 
-def print_banner():
-    """Imprime el banner de la aplicación."""
-    print()
-    print("=" * 50)
-    print("           AUDIO TOOLS")
-    print("=" * 50)
+# argv[0] que recibe cada herramienta ("main.py <nombre>"), construido una vez
+_ARGV0_CACHE = {}
 
 
-def show_menu():
-    """Muestra el menú interactivo y retorna la herramienta seleccionada."""
-    print_banner()
-    print("\nHerramientas disponibles:\n")
-    
-    tool_list = list(TOOLS.keys())
-    
-    for i, name in enumerate(tool_list, 1):
-        desc = TOOLS[name]["description"]
-        print(f"  {i}. {name}")
-        print(f"     {desc}\n")
+class _patched_argv:
+    """
+    Context manager: sustituye sys.argv mientras corre la herramienta y
+    restaura el valor previo al salir (seguro ante llamadas anidadas)
+    """
     
-    print(f"  0. Salir")
-    print()
+    def __init__(self, tool_name, args):
+        argv0 = _ARGV0_CACHE.get(tool_name)
+        if argv0 is None:
+            argv0 = _ARGV0_CACHE[tool_name] = sys.intern(f"main.py {tool_name}")
+        self._argv = [argv0, *args]
+        self._saved = None
     
-    while True:
-        try:
-            opcion = input("Selecciona una opción: ").strip()
-            
-            if opcion == "0" or opcion.lower() in ("salir", "exit", "q"):
-                return None
-            
-            # Intentar como número
-            try:
-                idx = int(opcion)
-                if 1 <= idx <= len(tool_list):
-                    return tool_list[idx - 1]
-                else:
-                    print(f"Opción inválida. Ingresa un número del 1 al {len(tool_list)} (o 0 para salir)")
-            except ValueError:
-                # Intentar como nombre de herramienta
-                if opcion in TOOLS:
-                    return opcion
-                print(f"Herramienta '{opcion}' no encontrada. Intenta de nuevo.")
-                
-        except (KeyboardInterrupt, EOFError):
-            print("\n")
-            return None
-
-
-def get_tool_args(tool_name):
-    """Solicita los argumentos para la herramienta seleccionada."""
-    print(f"\n--- {tool_name} ---")
-    print("Ingresa los argumentos (o presiona Enter para ver la ayuda):\n")
+    def __enter__(self):
+        self._saved = sys.argv
+        sys.argv = self._argv
+        return self._argv
     
-    try:
-        args_str = input(f"{tool_name} > ").strip()
-        if args_str:
-            return args_str.split()
-        return ["--help"]
-    except (KeyboardInterrupt, EOFError):
-        print("\n")
-        return None
+    def __exit__(self, *exc_info):
+        sys.argv = self._saved
+        return False
 
 
 def run_tool(tool_name, args):
-    """Ejecuta la herramienta especificada con los argumentos dados."""
-    if tool_name not in TOOLS:
+    """
+    Ejecuta la herramienta especificada con los argumentos dados
+    (args: cualquier iterable de strings; se consume una sola vez)
+    """
+    idx = _TOOL_INDEX.get(tool_name)
+    if idx is None:
         print(f"Error: Herramienta desconocida '{tool_name}'")
         return 1
     
-    tool_info = TOOLS[tool_name]
-    
     try:
-        module = importlib.import_module(tool_info["module"])
+        fn = _resolve_tool(idx)
+        if fn is None:
+            print(f"Error: La herramienta '{tool_name}' no tiene función main()")
+            return 1
         
         # Configurar sys.argv para la herramienta
-        original_argv = sys.argv
-        sys.argv = [f"main.py {tool_name}"] + args
-        
-        try:
-            if hasattr(module, "main"):
-                return module.main()
-            else:
-                print(f"Error: La herramienta '{tool_name}' no tiene función main()")
-                return 1
-        finally:
-            sys.argv = original_argv
+        with _patched_argv(tool_name, args):
+            return fn()
             
     except ImportError as e:
-        print(f"Error: No se pudo importar el módulo '{tool_info['module']}'")
+        print(f"Error: No se pudo importar el módulo '{_TOOL_MODULES[idx]}'")
         print(f"Detalles: {e}")
         return 1
     except Exception as e:
@@ -127,42 +126,48 @@ def run_tool(tool_name, args):
         return 1
 
 
-def main():
-    """Punto de entrada principal."""
-    # Con argumentos - modo directo
-    if len(sys.argv) >= 2:
-        first_arg = sys.argv[1]
-        
-        # Ayuda
-        if first_arg in ("--help", "-h", "help", "ayuda"):
-            print_banner()
-            print("\nUso:")
-            print("  python main.py                    Menú interactivo")
-            print("  python main.py <herramienta>      Ejecutar herramienta")
-            print("\nHerramientas disponibles:")
-            for name, info in TOOLS.items():
-                print(f"  {name:<15} {info['description']}")
-            return 0
-        
-        # Ejecutar herramienta directamente
-        tool_name = first_arg
-        tool_args = sys.argv[2:]
-        return run_tool(tool_name, tool_args)
+def _help_text():
+    """Texto completo de --help, emitido con una sola escritura."""
+    from tools._interactive import BANNER
     
-    # Sin argumentos - menú interactivo
-    tool_name = show_menu()
+    return BANNER + _HELP_BODY
+
+
+def _dispatch_direct(argv):
+    """Modo directo: solo consulta la herramienta indicada en argv[1]."""
+    first_arg = sys.intern(argv[1])
     
-    if not tool_name:
-        print("Saliendo...")
+    # Ayuda - único caso que recorre el registro completo
+    if first_arg in _HELP_ALIASES:
+        sys.stdout.write(_help_text())
         return 0
     
-    args = get_tool_args(tool_name)
+    # Ejecutar herramienta directamente; islice evita copiar argv[2:] en una
+    # lista intermedia (_patched_argv arma el argv final en una sola lista)
+    from itertools import islice
     
-    if args is None:
-        print("Cancelado.")
-        return 0
+    return run_tool(first_arg, islice(argv, 2, None))
+
+
+def _dispatch_interactive():
+    """Modo interactivo: todo el código de menú vive en tools._interactive."""
+    from tools import _interactive
     
-    return run_tool(tool_name, args)
+    return _interactive.run_menu(_TOOL_NAMES, _TOOL_DESCS, run_tool)
+
+
+def main():
+    """Punto de entrada principal."""
+    # Con argumentos - modo directo
+    if len(sys.argv) >= 2:
+        if sys.argv[1] == "--daemon":
+            from tools import _daemon
+            
+            return _daemon.iniciar(_dispatch_direct)
+        return _dispatch_direct(sys.argv)
+    
+    # Sin argumentos - menú interactivo
+    return _dispatch_interactive()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,333 @@
+"""
+Pruebas de las funciones puras de tools/delay_fix.py
+
+Ejecutar desde la raíz del proyecto:
+    python -m unittest discover tests
+    python -m pytest tests
+"""
+
+import contextlib
+import importlib.util
+import io
+import os
+import tempfile
+import unittest
+from fractions import Fraction
+from unittest import mock
+
+# delay_fix termina el proceso al importarse si falta pymediainfo
+if importlib.util.find_spec("pymediainfo") is None:
+    raise unittest.SkipTest("pymediainfo no está instalado")
+
+import tools.delay_fix as delay_fix
+
+
+def silencioso(funcion, *args, **kwargs):
+    """Llama a funcion descartando lo que imprime en stdout"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return funcion(*args, **kwargs)
+
+
+class TestParsearDelay(unittest.TestCase):
+    
+    def test_formatos_aceptados(self):
+        casos = {
+            "2000": 2000.0,
+            "2000ms": 2000.0,
+            "2.0s": 2000.0,
+            "2s": 2000.0,
+            "-2000": -2000.0,
+            "-2000ms": -2000.0,
+            "-2.0s": -2000.0,
+            "+500": 500.0,
+            "+2s": 2000.0,
+            "0": 0.0,
+            # Sin unidad, < 100 y con punto decimal se interpreta en segundos
+            "1.5": 1500.0,
+            "-1.5": -1500.0,
+            "150.5": 150.5,
+            ".5": 500.0,
+            " 2000 MS ": 2000.0,
+            "- 500": -500.0,
+        }
+        for texto, esperado in casos.items():
+            with self.subTest(texto=texto):
+                self.assertEqual(delay_fix.parsear_delay(texto), esperado)
+    
+    def test_formatos_rechazados(self):
+        for texto in ("", None, "abc", "1e3", "inf", "nan", "--5", "+-5",
+                      "1_000", "5m", "ms", "1.2.3", "5 min"):
+            with self.subTest(texto=texto):
+                self.assertIsNone(delay_fix.parsear_delay(texto))
+
+
+class TestParsearTarget(unittest.TestCase):
+    
+    def test_formatos_aceptados(self):
+        casos = {
+            "01:35:50": 5750.0,
+            "1:35:50.500": 5750.5,
+            "35:50.500": 2150.5,
+            "50.500": 50.5,
+            ".500": 0.5,
+            "1.5": 1.5,
+            "+1:30": 90.0,
+            # Horas y minutos con decimales
+            "1.5:30": 120.0,
+            "0.5:0:0": 1800.0,
+            " 1 : 30 ": 90.0,
+        }
+        for texto, esperado in casos.items():
+            with self.subTest(texto=texto):
+                self.assertAlmostEqual(delay_fix.parsear_target(texto), esperado, places=9)
+    
+    def test_formatos_rechazados(self):
+        for texto in ("", None, "abc", "-5", "-1:30", "1e2", "inf", "1_0",
+                      "1:2:", ":30", "1:2:3:4", "1::2"):
+            with self.subTest(texto=texto):
+                self.assertIsNone(delay_fix.parsear_target(texto))
+
+
+class TestAjustarDelayAFrames(unittest.TestCase):
+    
+    def elegidos(self, delay_ms, frame_duration_ms):
+        return delay_fix.ajustar_delay_a_frames(delay_ms, frame_duration_ms)[1]
+    
+    def test_frame_mas_cercano(self):
+        # AC-3: 1536 muestras a 48 kHz = 32 ms
+        casos = {17: 1, 15: 0, 49: 2, 100: 3, -17: -1, -15: 0, -49: -2, 0: 0}
+        for delay_ms, esperado in casos.items():
+            with self.subTest(delay_ms=delay_ms):
+                self.assertEqual(self.elegidos(delay_ms, 32), esperado)
+    
+    def test_empate_a_medio_frame_elige_el_inferior(self):
+        casos = {16: 0, 48: 1, -16: -1, -48: -2}
+        for delay_ms, esperado in casos.items():
+            with self.subTest(delay_ms=delay_ms):
+                self.assertEqual(self.elegidos(delay_ms, 32), esperado)
+    
+    def test_empate_con_frame_no_entero(self):
+        # TrueHD: 40 muestras a 48 kHz = 5/6 ms; 1.25 ms es 1.5 frames exactos
+        frame_ms = 40 * 1000 / 48000
+        ajustado, elegidos, exactos = delay_fix.ajustar_delay_a_frames(1.25, frame_ms)
+        self.assertEqual(elegidos, 1)
+        self.assertAlmostEqual(exactos, 1.5, places=9)
+        self.assertAlmostEqual(ajustado, frame_ms, places=9)
+        self.assertEqual(self.elegidos(-1.25, frame_ms), -2)
+    
+    def test_delay_ajustado_es_multiplo_del_frame(self):
+        ajustado, elegidos, _ = delay_fix.ajustar_delay_a_frames(-1000, 32)
+        self.assertEqual(elegidos, Fraction(-31))
+        self.assertEqual(ajustado, -992)
+
+
+class TestMajorSyncMLP(unittest.TestCase):
+    
+    def archivo(self, datos):
+        with tempfile.NamedTemporaryFile(suffix=".thd", delete=False) as f:
+            f.write(datos)
+        self.addCleanup(os.unlink, f.name)
+        return f.name
+    
+    def test_truehd_ratebits_tras_el_sync(self):
+        # 0xBA: el código de sample rate es el nibble alto del byte siguiente
+        casos = {0x00: (48000, 0, 40), 0x10: (96000, 1, 80),
+                 0x20: (192000, 2, 160), 0x80: (44100, 8, 40)}
+        for byte, (frecuencia, ratebits, spf) in casos.items():
+            with self.subTest(frecuencia=frecuencia):
+                ruta = self.archivo(b"\x00" * 7 + b"\xf8\x72\x6f\xba" + bytes([byte]) + b"\x00" * 4)
+                self.assertEqual(delay_fix._ratebits_mlp(ruta, frecuencia), ratebits)
+                self.assertEqual(silencioso(delay_fix._spf_truehd, "TrueHD", frecuencia, ruta), spf)
+    
+    def test_mlp_ratebits_tras_la_cuantizacion(self):
+        # 0xBB: un byte de cuantización y luego el código de sample rate
+        ruta = self.archivo(b"\xf8\x72\x6f\xbb\x00\x10\x00")
+        self.assertEqual(delay_fix._ratebits_mlp(ruta, 96000), 1)
+        self.assertEqual(silencioso(delay_fix._spf_truehd, "MLP FBA", 96000, ruta), 80)
+    
+    def test_descarta_syncs_invalidos_o_con_otra_frecuencia(self):
+        # Primer sync con código 0xF (inválido), segundo a 48 kHz, tercero a 96 kHz
+        ruta = self.archivo(b"\xf8\x72\x6f\xba\xf0" + b"\xf8\x72\x6f\xba\x00"
+                            + b"\xf8\x72\x6f\xba\x10")
+        self.assertEqual(delay_fix._ratebits_mlp(ruta, None), 0)
+        self.assertEqual(delay_fix._ratebits_mlp(ruta, 96000), 1)
+        self.assertIsNone(delay_fix._ratebits_mlp(ruta, 44100))
+    
+    def test_sync_cortado_al_final(self):
+        self.assertIsNone(delay_fix._ratebits_mlp(self.archivo(b"\x00\xf8\x72\x6f\xba"), None))
+    
+    def test_sin_sync_usa_el_sample_rate(self):
+        ruta = self.archivo(b"\x00" * 64)
+        self.assertIsNone(delay_fix._ratebits_mlp(ruta, 96000))
+        self.assertEqual(silencioso(delay_fix._spf_truehd, "TrueHD", 96000, ruta), 80)
+        self.assertIsNone(silencioso(delay_fix._spf_truehd, "TrueHD", 32000, ruta))
+        self.assertIsNone(delay_fix._spf_truehd("AC-3", 48000, ruta))
+
+
+class TestParsearSalidaSilencedetect(unittest.TestCase):
+    
+    SALIDA = (
+        "size=N/A time=00:00:01.00 bitrate=N/A speed= 500x\n"
+        "[silencedetect @ 0x55d1c0a1b2c0] silence_end: 0.5 | silence_duration: 0.5\n"
+        "[silencedetect @ 0x55d1c0a1b2c0] silence_start: 1.25\n"
+        "[silencedetect @ 0x55d1c0a1b2c0] silence_end: 1.5 | silence_duration: 0.25\n"
+        "[silencedetect @ 0x55d1c0a1b2c0] silence_start: 10\n"
+        "[silencedetect @ 0x55d1c0a1b2c0] silence_end: 12.004 | silence_duration: 2.004\n"
+        "[silencedetect @ 0x55d1c0a1b2c0] silence_start: 20.5\n"
+    )
+    ESPERADO = [
+        {'inicio': 1.25, 'fin': 1.5, 'duracion': 0.25, 'umbral': -50},
+        {'inicio': 10.0, 'fin': 12.004, 'duracion': 2.004, 'umbral': -50},
+    ]
+    
+    def test_texto_completo_y_lineas_dan_lo_mismo(self):
+        # Un silence_end sin silence_start previo y un silence_start sin cerrar se ignoran
+        self.assertEqual(silencioso(delay_fix.parsear_salida_silencedetect, self.SALIDA, -50), self.ESPERADO)
+        lineas = self.SALIDA.splitlines(keepends=True)
+        self.assertEqual(silencioso(delay_fix.parsear_salida_silencedetect, iter(lineas), -50), self.ESPERADO)
+    
+    def test_corte_en_el_primer_segmento_suficiente(self):
+        segmentos = silencioso(delay_fix.parsear_salida_silencedetect, self.SALIDA, -50, 0.2)
+        self.assertEqual(segmentos, self.ESPERADO[:1])
+        # silence_duration se imprime con 6 dígitos: 2.004 alcanza d=2.004
+        segmentos = silencioso(delay_fix.parsear_salida_silencedetect, self.SALIDA, -50, 2.004)
+        self.assertEqual(segmentos, self.ESPERADO)
+    
+    def test_sin_segmentos(self):
+        self.assertEqual(silencioso(delay_fix.parsear_salida_silencedetect, "sin silencios\n", -50), [])
+
+
+class TestParsearMediainfo(unittest.TestCase):
+    
+    def test_cache_acotada_a_los_ultimos_archivos(self):
+        rutas = []
+        for i in range(delay_fix._MEDIAINFO_CACHE_MAX + 2):
+            with tempfile.NamedTemporaryFile(suffix=".mka", delete=False) as f:
+                f.write(b"\x00" * (i + 1))
+            self.addCleanup(os.unlink, f.name)
+            rutas.append(f.name)
+        
+        with mock.patch.dict(delay_fix._MEDIAINFO_CACHE, clear=True), \
+                mock.patch("pymediainfo.MediaInfo.parse", side_effect=lambda ruta: object()) as parse:
+            primero = delay_fix.parsear_mediainfo(rutas[0])
+            for ruta in rutas[1:]:
+                delay_fix.parsear_mediainfo(ruta)
+                # El primero se sigue usando: no es el más antiguo
+                self.assertIs(delay_fix.parsear_mediainfo(rutas[0]), primero)
+            self.assertEqual(len(delay_fix._MEDIAINFO_CACHE), delay_fix._MEDIAINFO_CACHE_MAX)
+            self.assertEqual(parse.call_count, len(rutas))
+            delay_fix.parsear_mediainfo(rutas[1])
+            self.assertEqual(parse.call_count, len(rutas) + 1)
+
+
+class TestCacheJSON(unittest.TestCase):
+    
+    def setUp(self):
+        directorio = tempfile.TemporaryDirectory()
+        self.addCleanup(directorio.cleanup)
+        parche = mock.patch.dict(os.environ, {"XDG_CACHE_HOME": directorio.name})
+        parche.start()
+        self.addCleanup(parche.stop)
+    
+    def test_persiste_entre_instancias(self):
+        delay_fix._CacheJSON("prueba.json", 4).guardar("a", {"spf": 1536})
+        self.assertEqual(delay_fix._CacheJSON("prueba.json", 4).cargar("a"), {"spf": 1536})
+        self.assertIsNone(delay_fix._CacheJSON("prueba.json", 4).cargar("b"))
+    
+    def test_descarta_las_entradas_mas_antiguas(self):
+        cache = delay_fix._CacheJSON("prueba.json", 2)
+        cache.guardar("a", 1)
+        cache.guardar("b", 2)
+        cache.guardar("a", 3)
+        cache.guardar("c", 4)
+        nueva = delay_fix._CacheJSON("prueba.json", 2)
+        self.assertIsNone(nueva.cargar("b"))
+        self.assertEqual((nueva.cargar("a"), nueva.cargar("c")), (3, 4))
+    
+    def test_ignora_otra_version_de_esquema(self):
+        cache = delay_fix._CacheJSON("prueba.json", 4)
+        cache.guardar("a", 1)
+        with open(cache.ruta(), "w", encoding="utf-8") as f:
+            f.write('{"version": 0, "entradas": {"a": 1}}')
+        self.assertIsNone(delay_fix._CacheJSON("prueba.json", 4).cargar("a"))
+        with open(cache.ruta(), "w", encoding="utf-8") as f:
+            f.write('{"a": 1}')
+        self.assertIsNone(delay_fix._CacheJSON("prueba.json", 4).cargar("a"))
+    
+    def test_metadatos_de_la_misma_entrada_en_otra_ejecucion(self):
+        directorio = tempfile.TemporaryDirectory()
+        self.addCleanup(directorio.cleanup)
+        origen = os.path.join(directorio.name, "pelicula.ac3")
+        mka = os.path.join(directorio.name, "pelicula.mka")
+        with open(origen, "wb") as f:
+            f.write(b"\x0b\x77" * 64)
+        
+        track = mock.Mock(track_type="Audio")
+        track.to_data.return_value = {"codec_id": "A_AC3", "sampling_rate": 48000,
+                                      "samples_per_frame": "1536", "duration": 1000.0}
+        
+        def ejecucion(contenido_mka):
+            # Cada ejecución re-crea el MKA temporal (otro tamaño/mtime) y
+            # arranca con la caché en memoria vacía, como un proceso nuevo
+            with open(mka, "wb") as f:
+                f.write(contenido_mka)
+            with mock.patch.object(delay_fix, "_CACHE_METADATOS", delay_fix._CacheJSON("metadata.json", 512)):
+                return silencioso(delay_fix.obtener_metadatos_mediainfo, mka, origen)
+        
+        with mock.patch.object(delay_fix, "parsear_mediainfo", return_value=mock.Mock(tracks=[track])) as parse:
+            primera = ejecucion(b"primera")
+            segunda = ejecucion(b"segunda ejecucion")
+        
+        self.assertEqual(parse.call_count, 1)
+        self.assertEqual(primera["Frame_duration_ms"], 32.0)
+        self.assertEqual(segunda, primera)
+    
+    def test_silencedetect_de_la_misma_entrada_en_otra_ejecucion(self):
+        directorio = tempfile.TemporaryDirectory()
+        self.addCleanup(directorio.cleanup)
+        origen = os.path.join(directorio.name, "pelicula.ac3")
+        mka = os.path.join(directorio.name, "pelicula.mka")
+        with open(origen, "wb") as f:
+            f.write(b"\x0b\x77" * 64)
+        segmentos = [{'inicio': 1.0, 'fin': 1.6, 'duracion': 0.6, 'umbral': -90}]
+        
+        def ejecucion(contenido_mka, version="ffmpeg version 6.1"):
+            with open(mka, "wb") as f:
+                f.write(contenido_mka)
+            with mock.patch.object(delay_fix, "_CACHE_SILENCEDETECT", delay_fix._CacheJSON("silencedetect.json", 128)), \
+                    mock.patch.object(delay_fix, "_version_ffmpeg", return_value=version):
+                clave_origen = delay_fix._clave_cache_silencedetect(origen)
+                return silencioso(delay_fix._detectar_silencio_cacheado, mka, -90, 0.3, 0.5, clave_origen)
+        
+        with mock.patch.object(delay_fix, "detectar_silencio_ffmpeg", return_value=segmentos) as detectar:
+            self.assertEqual(ejecucion(b"primera"), segmentos)
+            self.assertEqual(ejecucion(b"segunda ejecucion"), segmentos)
+            self.assertEqual(detectar.call_count, 1)
+            # Otra versión de ffmpeg puede dar otros segmentos: se vuelve a analizar
+            ejecucion(b"tercera", "ffmpeg version 7.0")
+            self.assertEqual(detectar.call_count, 2)
+    
+    def test_silencedetect_sin_origen_no_usa_la_cache(self):
+        with tempfile.NamedTemporaryFile(suffix=".mka", delete=False) as f:
+            f.write(b"corte")
+        self.addCleanup(os.unlink, f.name)
+        cache = delay_fix._CacheJSON("silencedetect.json", 128)
+        with mock.patch.object(delay_fix, "_CACHE_SILENCEDETECT", cache), \
+                mock.patch.object(delay_fix, "detectar_silencio_ffmpeg", return_value=[]) as detectar:
+            delay_fix._detectar_silencio_cacheado(f.name, -90, 0.3, 0.5)
+            delay_fix._detectar_silencio_cacheado(f.name, -90, 0.3, 0.5)
+        self.assertEqual(detectar.call_count, 2)
+        self.assertFalse(cache.ruta().exists())
+    
+    def test_clave_cambia_con_el_archivo(self):
+        with tempfile.NamedTemporaryFile(delete=False) as f:
+            f.write(b"123")
+        self.addCleanup(os.unlink, f.name)
+        clave = delay_fix._clave_cache_metadatos(f.name)
+        with open(f.name, "ab") as g:
+            g.write(b"4")
+        self.assertNotEqual(delay_fix._clave_cache_metadatos(f.name), clave)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1 +1,21 @@
 # Tools package
+import importlib
+import types
+
+
+class _ModuloPerezoso(types.ModuleType):
+    """
+    Proxy de módulo: la importación real se difiere hasta el primer
+    acceso a un atributo (ej: modulo.main)
+    """
+
+    def __getattr__(self, nombre):
+        # import_module cachea en sys.modules: solo el primer acceso paga la importación
+        return getattr(importlib.import_module(self.__name__), nombre)
+
+
+def lazy_import(nombre_modulo):
+    """
+    Retorna un proxy del módulo indicado sin importarlo todavía
+    """
+    return _ModuloPerezoso(nombre_modulo)
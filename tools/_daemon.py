@@ -0,0 +1,293 @@
+"""
+Audio Tools - Modo Daemon
+=========================
+Proceso persistente que atiende invocaciones de herramientas a través de
+un socket Unix, evitando pagar el arranque del intérprete y la importación
+de cada herramienta en llamadas repetidas.
+
+Servidor:  python main.py --daemon
+Cliente:   python main-client.py <herramienta> [args]
+
+El socket vive en un directorio propio del usuario ($XDG_RUNTIME_DIR o
+<tmp>/audio-tools-<uid>, modo 0700) y ambos extremos verifican que el otro
+proceso pertenezca al mismo uid antes de intercambiar datos.
+
+PROTOCOLO (tramas: 1 byte tipo + 4 bytes longitud big-endian + datos):
+  cliente → daemon  A  JSON {"argv": [...], "cwd": "..."}
+  daemon → cliente  O  fragmento de stdout (UTF-8)
+                    E  fragmento de stderr (UTF-8)
+                    R  código de retorno (entero en ASCII), cierra la sesión
+"""
+
+import io
+import json
+import os
+import socket
+import stat
+import struct
+import sys
+import tempfile
+
+_NOMBRE_SOCKET = "audio-tools.sock"
+
+_CABECERA = struct.Struct("!cI")
+
+# struct ucred de Linux: pid, uid, gid
+_UCRED = struct.Struct("3i")
+
+
+def _directorio_privado():
+    """
+    Directorio del socket, accesible solo por el usuario actual:
+    $XDG_RUNTIME_DIR si existe (ya es 0700 y propio); si no,
+    <tmp>/audio-tools-<uid>, creado con modo 0700 y verificado
+    (propietario, permisos, no symlink) para que otro usuario no pueda
+    adelantarse creándolo
+    """
+    runtime = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime and os.path.isdir(runtime):
+        return runtime
+
+    directorio = os.path.join(tempfile.gettempdir(), f"audio-tools-{os.getuid()}")
+    try:
+        os.mkdir(directorio, 0o700)
+    except FileExistsError:
+        pass
+
+    st = os.lstat(directorio)
+    if (not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid()
+            or stat.S_IMODE(st.st_mode) & 0o077):
+        raise PermissionError(f"{directorio} no es un directorio privado del usuario actual")
+    return directorio
+
+
+def ruta_socket():
+    """Ruta del socket del daemon para el usuario actual"""
+    return os.path.join(_directorio_privado(), _NOMBRE_SOCKET)
+
+
+def _mismo_usuario(sock, ruta=None):
+    """
+    True si el proceso al otro lado del socket es del usuario actual:
+    SO_PEERCRED donde existe (Linux); si no, el propietario del archivo
+    del socket (dentro de un directorio 0700 propio)
+    """
+    if hasattr(socket, "SO_PEERCRED"):
+        _, uid, _ = _UCRED.unpack(
+            sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, _UCRED.size)
+        )
+        return uid == os.getuid()
+    if ruta is None:
+        return False
+    try:
+        return os.stat(ruta).st_uid == os.getuid()
+    except OSError:
+        return False
+
+
+def _enviar_trama(sock, tipo, datos):
+    sock.sendall(_CABECERA.pack(tipo, len(datos)) + datos)
+
+
+def _recibir_exacto(sock, n):
+    buf = bytearray()
+    while len(buf) < n:
+        chunk = sock.recv(n - len(buf))
+        if not chunk:
+            raise ConnectionError("Conexión cerrada por el otro extremo")
+        buf += chunk
+    return bytes(buf)
+
+
+def _recibir_trama(sock):
+    tipo, longitud = _CABECERA.unpack(_recibir_exacto(sock, _CABECERA.size))
+    return tipo, _recibir_exacto(sock, longitud)
+
+
+class _SalidaRemota(io.TextIOBase):
+    """Stream de texto que reenvía cada escritura al cliente como una trama"""
+
+    def __init__(self, sock, tipo):
+        self._sock = sock
+        self._tipo = tipo
+
+    def writable(self):
+        return True
+
+    def write(self, texto):
+        if texto:
+            _enviar_trama(self._sock, self._tipo, texto.encode("utf-8"))
+        return len(texto)
+
+
+def ejecutar_remoto(argv, ruta=None):
+    """
+    Envía argv al daemon y reproduce su salida localmente
+    Retorna el código de retorno, o None si no hay daemon escuchando
+    (o el socket no es de un daemon del usuario actual)
+    """
+    try:
+        if ruta is None:
+            ruta = ruta_socket()
+    except OSError:
+        return None
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        try:
+            sock.connect(ruta)
+        except (FileNotFoundError, ConnectionRefusedError):
+            return None
+
+        if not _mismo_usuario(sock, ruta):
+            print(f"Advertencia: {ruta} pertenece a otro usuario; se ejecuta localmente",
+                  file=sys.stderr)
+            return None
+
+        peticion = json.dumps({"argv": list(argv), "cwd": os.getcwd()})
+        try:
+            _enviar_trama(sock, b"A", peticion.encode("utf-8"))
+
+            while True:
+                tipo, datos = _recibir_trama(sock)
+                if tipo == b"O":
+                    sys.stdout.write(datos.decode("utf-8"))
+                elif tipo == b"E":
+                    sys.stderr.write(datos.decode("utf-8"))
+                elif tipo == b"R":
+                    sys.stdout.flush()
+                    return int(datos)
+        except (OSError, struct.error, ValueError) as e:
+            # ConnectionError es subclase de OSError
+            sys.stdout.flush()
+            print(f"Error: Se interrumpió la comunicación con el daemon ({e})", file=sys.stderr)
+            return 1
+    finally:
+        sock.close()
+
+
+def _daemon_activo(ruta):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(ruta)
+        return True
+    except OSError:
+        return False
+    finally:
+        sock.close()
+
+
+def _crear_servidor(despachar, ruta):
+    import socketserver
+    from contextlib import redirect_stderr, redirect_stdout
+
+    class Manejador(socketserver.BaseRequestHandler):
+        def handle(self):
+            sock = self.request
+            # Solo se atiende a procesos del mismo usuario que el daemon
+            if not _mismo_usuario(sock):
+                return
+
+            try:
+                _, datos = _recibir_trama(sock)
+                peticion = json.loads(datos)
+                argv = peticion.get("argv") or []
+            except (OSError, struct.error, ValueError, AttributeError):
+                return
+
+            cwd_previo = os.getcwd()
+            try:
+                with redirect_stdout(_SalidaRemota(sock, b"O")), \
+                        redirect_stderr(_SalidaRemota(sock, b"E")):
+                    if not argv:
+                        print("Error: El menú interactivo no está disponible vía daemon")
+                        rc = 1
+                    else:
+                        # Rutas relativas del cliente se resuelven contra su directorio
+                        os.chdir(peticion.get("cwd") or cwd_previo)
+                        rc = despachar(["main.py", *argv])
+            except SystemExit as e:
+                rc = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+            except Exception as e:
+                # El cliente siempre recibe la trama R, con el error en su stderr
+                rc = 1
+                try:
+                    _enviar_trama(sock, b"E", f"Error en el daemon: {type(e).__name__}: {e}\n".encode("utf-8"))
+                except OSError:
+                    return
+            finally:
+                os.chdir(cwd_previo)
+
+            if not isinstance(rc, int):
+                rc = 0 if rc is None else 1
+
+            try:
+                _enviar_trama(sock, b"R", str(rc).encode("ascii"))
+            except OSError:
+                pass
+
+    return socketserver.UnixStreamServer(ruta, Manejador)
+
+
+def iniciar(despachar, ruta=None):
+    """
+    Inicia el daemon en segundo plano (fork) y retorna en el proceso padre
+    despachar: función que recibe argv completo (como _dispatch_direct)
+    """
+    if not hasattr(os, "fork") or not hasattr(socket, "AF_UNIX"):
+        print("Error: El modo daemon requiere un sistema POSIX (fork + sockets Unix)")
+        return 1
+
+    if ruta is None:
+        try:
+            ruta = ruta_socket()
+        except OSError as e:
+            print(f"Error: No se pudo preparar el directorio del socket: {e}")
+            return 1
+
+    if _daemon_activo(ruta):
+        print(f"Error: Ya hay un daemon escuchando en {ruta}")
+        return 1
+
+    # Socket huérfano de un daemon anterior
+    try:
+        os.unlink(ruta)
+    except FileNotFoundError:
+        pass
+
+    # bind antes del fork: los errores se reportan en primer plano
+    servidor = _crear_servidor(despachar, ruta)
+
+    pid = os.fork()
+    if pid:
+        servidor.socket.close()
+        print(f"Daemon iniciado (PID {pid})")
+        print(f"  Socket: {ruta}")
+        print(f"  Uso: python main-client.py <herramienta> [args]")
+        print(f"  Detener: kill {pid}")
+        return 0
+
+    os.setsid()
+    devnull = os.open(os.devnull, os.O_RDWR)
+    for fd in (0, 1, 2):
+        os.dup2(devnull, fd)
+
+    import signal
+
+    def _terminar(signum, frame):
+        raise SystemExit(0)
+
+    signal.signal(signal.SIGTERM, _terminar)
+
+    try:
+        servidor.serve_forever()
+    except SystemExit:
+        pass
+    finally:
+        servidor.server_close()
+        try:
+            os.unlink(ruta)
+        except FileNotFoundError:
+            pass
+    # El proceso hijo nunca vuelve al flujo de main.py
+    os._exit(0)
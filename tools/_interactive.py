@@ -0,0 +1,114 @@
+"""
+Audio Tools - Modo Interactivo
+==============================
+Banner, menú de selección y solicitud de argumentos. Solo se importa
+cuando main.py se ejecuta sin argumentos (o para el banner de --help).
+"""
+
+import sys
+from functools import lru_cache
+
+_EXIT_ALIASES = frozenset(("salir", "exit", "q"))
+
+BANNER = "\n".join(("", "=" * 50, "           AUDIO TOOLS", "=" * 50, ""))
+
+
+def print_banner():
+    """Imprime el banner de la aplicación."""
+    sys.stdout.write(BANNER)
+
+
+@lru_cache(maxsize=None)
+def _menu_text(tool_list, descriptions):
+    """Texto completo del menú (banner incluido), construido una vez por registro."""
+    lines = [BANNER, "Herramientas disponibles:", ""]
+    for i, (name, desc) in enumerate(zip(tool_list, descriptions), 1):
+        lines.append(f"  {i}. {name}")
+        lines.append(f"     {desc}")
+        lines.append("")
+    lines.append("  0. Salir")
+    lines.append("")
+    return "\n".join(lines) + "\n"
+
+
+def _prompt(msg):
+    """
+    input() para terminal; con stdin redirigido (pipe/archivo) lee la línea
+    directamente y evita cargar readline
+    """
+    if sys.stdin.isatty():
+        return input(msg)
+    
+    sys.stdout.write(msg)
+    sys.stdout.flush()
+    linea = sys.stdin.readline()
+    if not linea:
+        raise EOFError
+    return linea.rstrip("\n")
+
+
+def show_menu(tool_list, descriptions):
+    """Muestra el menú interactivo y retorna la herramienta seleccionada."""
+    # El menú se antepone al primer prompt y cada aviso al siguiente:
+    # una sola escritura por iteración del bucle
+    pendiente = _menu_text(tool_list, descriptions)
+    
+    while True:
+        try:
+            opcion = _prompt(pendiente + "Selecciona una opción: ").strip()
+            pendiente = ""
+            
+            if opcion == "0" or opcion.lower() in _EXIT_ALIASES:
+                return None
+            
+            # Intentar como número: dígitos con un '+' inicial opcional, como
+            # aceptaba int() (los espacios ya se quitaron con strip)
+            numero = opcion[1:] if opcion.startswith("+") else opcion
+            if numero.isdecimal():
+                idx = int(numero)
+                if 1 <= idx <= len(tool_list):
+                    return tool_list[idx - 1]
+                pendiente = f"Opción inválida. Ingresa un número del 1 al {len(tool_list)} (o 0 para salir)\n"
+            # Intentar como nombre de herramienta
+            elif opcion in tool_list:
+                return opcion
+            else:
+                pendiente = f"Herramienta '{opcion}' no encontrada. Intenta de nuevo.\n"
+                
+        except (KeyboardInterrupt, EOFError):
+            print("\n")
+            return None
+
+
+def get_tool_args(tool_name):
+    """Solicita los argumentos para la herramienta seleccionada."""
+    encabezado = (
+        f"\n--- {tool_name} ---\n"
+        "Ingresa los argumentos (o presiona Enter para ver la ayuda):\n\n"
+    )
+    
+    try:
+        args_str = _prompt(f"{encabezado}{tool_name} > ").strip()
+        if args_str:
+            return args_str.split()
+        return ["--help"]
+    except (KeyboardInterrupt, EOFError):
+        print("\n")
+        return None
+
+
+def run_menu(tool_list, descriptions, run_tool):
+    """Flujo completo del modo interactivo: menú, argumentos y ejecución."""
+    tool_name = show_menu(tool_list, descriptions)
+    
+    if not tool_name:
+        print("Saliendo...")
+        return 0
+    
+    args = get_tool_args(tool_name)
+    
+    if args is None:
+        print("Cancelado.")
+        return 0
+    
+    return run_tool(tool_name, args)
@@ -10,10 +10,9 @@ a frame boundaries, permitiendo target de duración exacta.
 FLUJO DE PROCESAMIENTO:
 1. Empaquetado a MKA (ffmpeg)      → Contenedor con metadatos confiables
 2. Extracción de metadatos (pymediainfo) → Frame duration crítico
-3. Conversión a WAV (ffmpeg)       → Para análisis de silencio
-4. Análisis de silencio (ffmpeg)   → Estrategia 500ms→400ms→300ms
-5. Extracción de silencio (ffmpeg) → Alineado a frame boundaries
-6. Aplicación delay/target (ffmpeg)→ Concatenación precisa
+3. Análisis de silencio (ffmpeg)   → Directo sobre el MKA, estrategia 500ms→400ms→300ms
+4. Extracción de silencio (ffmpeg) → Alineado a frame boundaries
+5. Aplicación delay/target (ffmpeg)→ Concatenación precisa
 
 CARACTERÍSTICAS:
 - Delay positivo: Agrega silencio al inicio
@@ -33,18 +32,214 @@ import shutil
 import json
 from pathlib import Path
 import tempfile
-from decimal import Decimal, InvalidOperation
-
-# Importar pymediainfo
-try:
-    from pymediainfo import MediaInfo
-    MEDIAINFO_AVAILABLE = True
-except ImportError:
-    MEDIAINFO_AVAILABLE = False
+import importlib.util
+from collections import deque
+from fractions import Fraction
+from functools import lru_cache
+
+# pymediainfo: aquí solo se verifica que esté instalado; el módulo (y
+# libmediainfo) se carga en el primer parse real, en parsear_mediainfo.
+# La ayuda, los errores de argumentos y los metadatos en caché no lo cargan
+if importlib.util.find_spec("pymediainfo") is None:
     print("Error: pymediainfo no está instalado.")
     print("Instala con: pip install pymediainfo")
     sys.exit(1)
 
+# Expresiones regulares compiladas una sola vez por proceso
+_RE_NFRAMES = re.compile(r'NUMBER_OF_FRAMES\s*[:=]?\s*(\d+)', re.IGNORECASE)
+_RE_DURATION = re.compile(r'DURATION\s*[:=]?\s*([\d:.]+)', re.IGNORECASE)
+_RE_DIGITOS = re.compile(r'(\d+)')
+_RE_SPF = re.compile(r'(?:sample_per_frame|samples_per_frame|spf)\s*[:=]?\s*(\d+)', re.IGNORECASE)
+# silence_start (grupo 1) o silence_end + silence_duration (grupos 2 y 3) en un solo patrón
+_RE_SILENCEDETECT = re.compile(
+    r'\[silencedetect[^\]]*\]\s+silence_(?:start:\s*(\d+\.?\d*)'
+    r'|end:\s*(\d+\.?\d*)\s*\|\s*silence_duration:\s*(\d+\.?\d*))'
+)
+# Número decimal sin exponente: 12, 12., 12.5, .5
+_NUMERO = r'(?:\d+(?:\.\d*)?|\.\d+)'
+# Delay: signo opcional (+ o -), número y unidad opcional (ms o s)
+_RE_DELAY = re.compile(rf'([-+]?)({_NUMERO})(ms|s)?')
+# Target: [+][[HH:]MM:]SS[.ms] en un solo match (horas y minutos opcionales,
+# también con decimales: 1.5:30 = 1 minuto y medio + 30 s)
+_RE_TARGET = re.compile(rf'\+?(?:(?:({_NUMERO}):)?({_NUMERO}):)?({_NUMERO})')
+# Sufijos de archivos intermedios al final del nombre (todos, en cualquier orden)
+_RE_SUFIJOS_MKA = re.compile(r'(?:_analisis|_temp|_processed)+$')
+_RE_SUFIJOS_PROCESO = re.compile(r'(?:_temp|_analisis|_delay|_target)+$')
+
+# MediaInfo ya parseados en este proceso: (dispositivo, inodo, tamaño, mtime_ns) -> MediaInfo
+# Un archivo reescrito por ffmpeg cambia tamaño/mtime y se vuelve a parsear
+# Solo los últimos parseados: un archivo consulta entrada y MKA temporal, y
+# en modo daemon los de ejecuciones anteriores no se vuelven a pedir
+_MEDIAINFO_CACHE = {}
+_MEDIAINFO_CACHE_MAX = 4
+
+# Cachés persistentes entre ejecuciones (JSON en ~/.cache/delay_fix)
+# Clave: "ruta absoluta:tamaño:mtime_ns" del archivo de entrada del usuario
+# (metadatos; solo se guardan resultados con frame duration) y
+# "tamaño:mtime_ns:sha1 del primer MiB|versión de ffmpeg|silencedetect:..."
+# de la misma entrada (segmentos de cada pasada de silencedetect, en su
+# propio archivo para que las listas de segmentos no desplacen a los
+# metadatos). Un archivo con otra versión de esquema se descarta completo
+# (2: metadatos por entrada del usuario; 3: silencedetect por entrada)
+_VERSION_CACHE = 3
+
+def _directorio_cache():
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return Path(base) / 'delay_fix'
+
+class _CacheJSON:
+    """
+    Caché persistente en un archivo JSON {"version": N, "entradas": {...}}
+    con un máximo de entradas (se descartan las más antiguas)
+    """
+    
+    def __init__(self, nombre_archivo, max_entradas):
+        self.nombre_archivo = nombre_archivo
+        self.max_entradas = max_entradas
+        self._entradas = None
+    
+    def ruta(self):
+        return _directorio_cache() / self.nombre_archivo
+    
+    def _leer(self):
+        try:
+            with open(self.ruta(), encoding='utf-8') as f:
+                datos = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(datos, dict) or datos.get('version') != _VERSION_CACHE:
+            return {}
+        entradas = datos.get('entradas')
+        return entradas if isinstance(entradas, dict) else {}
+    
+    def cargar(self, clave):
+        if self._entradas is None:
+            self._entradas = self._leer()
+        return self._entradas.get(clave)
+    
+    def guardar(self, clave, valor):
+        """
+        Agrega la entrada y reescribe el JSON de forma atómica (archivo temporal
+        + os.replace): procesos en paralelo nunca dejan un archivo a medias;
+        en el peor caso se pierde una entrada, que se recalcula
+        """
+        # Releer antes de escribir: conserva lo que guardaron otros procesos
+        entradas = self._leer()
+        entradas.pop(clave, None)
+        entradas[clave] = valor
+        while len(entradas) > self.max_entradas:
+            del entradas[next(iter(entradas))]
+        self._entradas = entradas
+        
+        ruta = self.ruta()
+        try:
+            ruta.parent.mkdir(parents=True, exist_ok=True)
+            temporal = ruta.with_name(f"{ruta.name}.{os.getpid()}.tmp")
+            with open(temporal, 'w', encoding='utf-8') as f:
+                json.dump({'version': _VERSION_CACHE, 'entradas': entradas}, f, ensure_ascii=False)
+            os.replace(temporal, ruta)
+        except OSError:
+            pass
+
+_CACHE_METADATOS = _CacheJSON('metadata.json', 512)
+_CACHE_SILENCEDETECT = _CacheJSON('silencedetect.json', 128)
+
+def _clave_cache_metadatos(ruta):
+    """
+    Identidad del archivo para la caché de metadatos; se calcula sobre la
+    entrada del usuario, no sobre el MKA temporal que cada ejecución re-crea
+    """
+    st = os.stat(ruta)
+    return f"{os.path.abspath(ruta)}:{st.st_size}:{st.st_mtime_ns}"
+
+# Bytes del inicio de la entrada que identifican su contenido en la caché de silencedetect
+_BYTES_HUELLA = 1 << 20
+
+@lru_cache(maxsize=None)
+def _version_ffmpeg_binario(ffmpeg_path, mtime_ns):
+    try:
+        salida = subprocess.run([ffmpeg_path, "-version"], stdout=subprocess.PIPE,
+                                stderr=subprocess.DEVNULL, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return salida.decode('utf-8', errors='replace').partition('\n')[0].strip()
+
+def _version_ffmpeg():
+    """
+    Primera línea de ffmpeg -version (None si no se puede ejecutar); se
+    consulta una vez por binario (ruta + mtime), también en modo daemon
+    """
+    ffmpeg_path = shutil.which("ffmpeg")
+    if ffmpeg_path is None:
+        return None
+    try:
+        return _version_ffmpeg_binario(ffmpeg_path, os.stat(ffmpeg_path).st_mtime_ns)
+    except OSError:
+        return None
+
+def _clave_cache_silencedetect(ruta):
+    """
+    Identidad de la entrada para la caché de silencedetect: tamaño, mtime y
+    SHA-1 del primer MiB, más la versión de ffmpeg (los segmentos dependen de
+    la implementación del filtro). None si algo de eso no se puede obtener
+    """
+    import hashlib
+    
+    version = _version_ffmpeg()
+    if version is None:
+        return None
+    try:
+        st = os.stat(ruta)
+        with open(ruta, 'rb') as f:
+            huella = hashlib.sha1(f.read(_BYTES_HUELLA)).hexdigest()
+    except OSError:
+        return None
+    return f"{st.st_size}:{st.st_mtime_ns}:{huella}|{version}"
+
+def parsear_mediainfo(ruta):
+    """
+    MediaInfo.parse con caché por identidad del archivo
+    """
+    st = os.stat(ruta)
+    clave = (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+    media_info = _MEDIAINFO_CACHE.pop(clave, None)
+    if media_info is None:
+        from pymediainfo import MediaInfo
+        
+        media_info = MediaInfo.parse(str(ruta))
+        while len(_MEDIAINFO_CACHE) >= _MEDIAINFO_CACHE_MAX:
+            del _MEDIAINFO_CACHE[next(iter(_MEDIAINFO_CACHE))]
+    # Reinsertado al final: el orden del dict es el de uso (el primero, el más antiguo)
+    _MEDIAINFO_CACHE[clave] = media_info
+    return media_info
+
+def _a_float(valor):
+    """
+    Valor numérico de MediaInfo a float: pymediainfo ya entrega int/float en
+    casi todos los campos; solo los textos pasan por la limpieza de espacios
+    y coma decimal
+    """
+    if isinstance(valor, (int, float)):
+        return float(valor)
+    return float(str(valor).replace(' ', '').replace(',', '.'))
+
+def primer_track_audio(media_info):
+    """
+    Primer track de audio de un MediaInfo (el que mapea 0:a:0), o None
+    """
+    return next((t for t in media_info.tracks if t.track_type == 'Audio'), None)
+
+def duracion_audio_ms(ruta):
+    """
+    Duración en ms del primer track de audio según MediaInfo (None si no hay)
+    Usa la caché de parsear_mediainfo: consultar varias veces el mismo
+    archivo (o sus hardlinks) cuesta un solo parse
+    """
+    track = primer_track_audio(parsear_mediainfo(ruta))
+    if track is None or track.duration is None:
+        return None
+    return _a_float(track.duration)
+
 def calcular_spf_preciso(tags, sample_rate):
     """
     Calcula SPF (Samples Per Frame) de manera precisa usando
@@ -62,16 +257,15 @@ def calcular_spf_preciso(tags, sample_rate):
                 elif key_str == 'DURATION' and not duracion_str:
                     duracion_str = str(value)
         else:
+            # Las regex ya ignoran mayúsculas: sin pasadas .upper() sobre el blob
             tags_str = str(tags)
-            if 'NUMBER_OF_FRAMES' in tags_str.upper():
-                match = re.search(r'NUMBER_OF_FRAMES\s*[:=]?\s*(\d+)', tags_str, re.IGNORECASE)
-                if match:
-                    numero_frames = match.group(1)
+            match = _RE_NFRAMES.search(tags_str)
+            if match:
+                numero_frames = match.group(1)
             
-            if not duracion_str and 'DURATION' in tags_str.upper():
-                match = re.search(r'DURATION\s*[:=]?\s*([\d:.]+)', tags_str, re.IGNORECASE)
-                if match:
-                    duracion_str = match.group(1)
+            match = _RE_DURATION.search(tags_str)
+            if match:
+                duracion_str = match.group(1)
         
         if not numero_frames or not duracion_str or not sample_rate:
             return None
@@ -99,7 +293,7 @@ def calcular_spf_preciso(tags, sample_rate):
         try:
             numero_frames_int = int(numero_frames)
         except ValueError:
-            match = re.search(r'(\d+)', numero_frames)
+            match = _RE_DIGITOS.search(numero_frames)
             if match:
                 numero_frames_int = int(match.group(1))
             else:
@@ -114,34 +308,157 @@ def calcular_spf_preciso(tags, sample_rate):
 
 def formato_tiempo_amigable(segundos_str):
     """
-    Convierte segundos a formato HH:MM:SS.ms manteniendo precisión
+    Convierte segundos a formato HH:MM:SS.ms (aritmética entera en milisegundos)
     """
     try:
         if isinstance(segundos_str, str):
             segundos_str = segundos_str.replace(' s', '').replace('seg', '').strip()
         
-        total = Decimal(str(segundos_str))
-        
-        horas = int(total // 3600)
-        minutos = int((total % 3600) // 60)
-        segundos_int = int(total % 60)
+        total_ms = int(round(float(segundos_str) * 1000))
+        signo = "-" if total_ms < 0 else ""
         
-        milisegundos_decimal = (total - int(total)) * 1000
-        milisegundos = int(milisegundos_decimal)
+        horas, resto = divmod(abs(total_ms), 3_600_000)
+        minutos, resto = divmod(resto, 60_000)
+        segundos_int, milisegundos = divmod(resto, 1000)
         
-        formato_hhmmss = f"{horas:02d}:{minutos:02d}:{segundos_int:02d}.{milisegundos:03d}"
-        segundos_formato = f"{float(total):.3f} s"
+        formato_hhmmss = f"{signo}{horas:02d}:{minutos:02d}:{segundos_int:02d}.{milisegundos:03d}"
+        segundos_formato = f"{total_ms / 1000:.3f} s"
         
         return f"{formato_hhmmss} ({segundos_formato})"
         
-    except (ValueError, InvalidOperation, AttributeError):
+    except (ValueError, TypeError, OverflowError):
         return str(segundos_str)
 
-def obtener_metadatos_mediainfo(mka_file):
+_CLAVES_SPF = ('sample_per_frame', 'samples_per_frame', 'spf')
+
+def _spf_desde_numero_frames(tags, sample_rate_val):
+    """SPF desde los tags NUMBER_OF_FRAMES y DURATION"""
+    if not tags or not sample_rate_val:
+        return None
+    spf = calcular_spf_preciso(tags, sample_rate_val)
+    if spf:
+        print(f"  SPF calculado desde NUMBER_OF_FRAMES/DURATION: {spf}")
+    return spf
+
+def _spf_desde_atributos(td):
+    """SPF desde atributos de texto del track cuyo nombre lo indique"""
+    for clave, valor in td.items():
+        if valor and isinstance(valor, str) and any(keyword in clave.lower() for keyword in _CLAVES_SPF):
+            try:
+                return int(valor.replace(' ', ''))
+            except ValueError:
+                pass
+    return None
+
+def _spf_desde_tags(tags):
+    """SPF desde claves de los tags (dict) o desde su texto"""
+    if not tags:
+        return None
+    
+    if isinstance(tags, dict):
+        for key, value in tags.items():
+            if any(keyword in str(key).lower() for keyword in _CLAVES_SPF):
+                try:
+                    return int(str(value).replace(' ', ''))
+                except ValueError:
+                    pass
+        return None
+    
+    match = _RE_SPF.search(str(tags))
+    return int(match.group(1)) if match else None
+
+def _spf_desde_frame_rate(frame_rate, sample_rate_val):
+    """SPF = sample rate / frame rate"""
+    if not frame_rate or not sample_rate_val:
+        return None
+    
+    try:
+        frame_rate_str = str(frame_rate).replace(' ', '')
+        if '/' in frame_rate_str:
+            num, den = map(int, frame_rate_str.split('/'))
+            fps = num / den
+        else:
+            fps = float(frame_rate_str)
+        
+        spf = int(sample_rate_val / fps)
+        print(f"  SPF calculado de frame rate: {sample_rate_val} / {fps} = {spf}")
+        return spf
+    except Exception as e:
+        print(f"  Error calculando SPF de frame rate: {e}")
+        return None
+
+def _spf_desde_atributos_exactos(td):
+    """SPF desde atributos conocidos del track, de cualquier tipo"""
+    for attr_name in ['samples_per_frame', 'sample_per_frame', 'spf', 'nb_samples']:
+        attr_value = td.get(attr_name)
+        if attr_value:
+            try:
+                return int(str(attr_value).replace(' ', ''))
+            except ValueError:
+                pass
+    return None
+
+# Major sync de TrueHD (0xBA) y MLP (0xBB); bytes de lectura para buscarlo
+_RE_MAJOR_SYNC_MLP = re.compile(rb'\xf8\x72\x6f[\xba\xbb]')
+_BYTES_BUSQUEDA_MLP = 1 << 20
+
+def _ratebits_mlp(ruta, sample_rate_val):
+    """
+    Código de sample rate (4 bits) del primer major sync TrueHD/MLP del archivo
+    TrueHD lo tiene en el nibble alto del byte que sigue al sync; MLP, tras
+    los dos campos de cuantización (nibble alto del segundo byte)
+    Si hay sample rate de MediaInfo, se descartan coincidencias que no lo den
+    """
+    try:
+        with open(ruta, 'rb') as f:
+            datos = f.read(_BYTES_BUSQUEDA_MLP)
+    except OSError:
+        return None
+    
+    for match in _RE_MAJOR_SYNC_MLP.finditer(datos):
+        pos = match.end() + (0 if datos[match.end() - 1] == 0xBA else 1)
+        if pos >= len(datos):
+            break
+        ratebits = datos[pos] >> 4
+        if ratebits == 0xF:
+            continue
+        frecuencia = (44100 if ratebits & 8 else 48000) << (ratebits & 7)
+        if not sample_rate_val or frecuencia == sample_rate_val:
+            return ratebits
+    return None
+
+def _spf_truehd(codec, sample_rate_val, ruta=None):
+    """
+    SPF de Dolby TrueHD/MLP: 40 muestras por access unit a 44.1/48 kHz,
+    duplicándose con cada múltiplo de la frecuencia (80 a 96 kHz, 160 a 192 kHz)
+    El múltiplo se lee del major sync del stream; sin él, del sample rate
+    """
+    if not codec or not any(c in str(codec).lower() for c in ['truehd', 'mlp']):
+        return None
+    
+    print(f"  Analizando Dolby TrueHD/MLP...")
+    ratebits = _ratebits_mlp(ruta, sample_rate_val) if ruta else None
+    if ratebits is not None:
+        spf = 40 << (ratebits & 7)
+        print(f"  SPF desde major sync TrueHD/MLP: {spf}")
+        return spf
+    
+    if sample_rate_val:
+        for base in (48000, 44100):
+            multiplo = sample_rate_val / base
+            if multiplo in (1, 2, 4):
+                spf = int(40 * multiplo)
+                print(f"  SPF asumido para TrueHD @ {sample_rate_val:.0f} Hz: {spf}")
+                return spf
+    return None
+
+def obtener_metadatos_mediainfo(mka_file, origen=None):
     """
     PASO 2: Extracción de metadatos REALES del contenedor MKA
     Herramienta: pymediainfo
     Propósito: Obtener frame duration crítico para alineación precisa
+    origen: archivo de entrada del que se creó el MKA (clave de la caché
+    persistente); sin él, la clave es el propio MKA
     """
     metadatos = {
         'Codec': 'N/A',
@@ -152,30 +469,32 @@ def obtener_metadatos_mediainfo(mka_file):
         'Duration_sample': 'N/A',
         'Duration_frame': 'N/A',
         'Frame_duration_ms': None,
-        'Frame_rate': 'N/A'
+        'Frame_rate': 'N/A',
+        'Duration_ms': None
     }
     
     try:
-        if not MEDIAINFO_AVAILABLE:
-            print("  ERROR: pymediainfo no está disponible")
-            return metadatos
+        clave_cache = _clave_cache_metadatos(origen or mka_file)
+        cacheados = _CACHE_METADATOS.cargar(clave_cache)
+        if cacheados:
+            print(f"  Metadatos desde caché: SPF {cacheados['SPF']}, "
+                  f"frame duration {cacheados['Frame_duration_ms']:.6f} ms")
+            return dict(cacheados)
         
-        media_info = MediaInfo.parse(str(mka_file))
-        
-        audio_track = None
-        for track in media_info.tracks:
-            if track.track_type == 'Audio':
-                audio_track = track
-                break
+        audio_track = primer_track_audio(parsear_mediainfo(mka_file))
         
         if not audio_track:
             print(f"  No se encontró track de audio en {mka_file}")
             return metadatos
         
-        metadatos['Codec'] = getattr(audio_track, 'codec_id', getattr(audio_track, 'format', 'N/A'))
-        metadatos['Canales'] = getattr(audio_track, 'channel_s', getattr(audio_track, 'channels', 'N/A'))
+        # Un solo dict con todos los atributos del track; las búsquedas son
+        # lookups directos en lugar de getattr/dir() sobre el objeto Track
+        td = audio_track.to_data()
+        
+        metadatos['Codec'] = td.get('codec_id') or td.get('format') or 'N/A'
+        metadatos['Canales'] = td.get('channel_s') or td.get('channels') or 'N/A'
         
-        bitrate = getattr(audio_track, 'bit_rate', None)
+        bitrate = td.get('bit_rate')
         if bitrate:
             try:
                 bitrate_val = int(str(bitrate).replace(' ', ''))
@@ -183,110 +502,46 @@ def obtener_metadatos_mediainfo(mka_file):
             except:
                 metadatos['Bitrate'] = str(bitrate)
         
-        sample_rate = getattr(audio_track, 'sampling_rate', None)
+        sample_rate = td.get('sampling_rate')
         sample_rate_val = None
         if sample_rate:
             try:
-                sample_rate_val = float(str(sample_rate).replace(' ', ''))
+                sample_rate_val = _a_float(sample_rate)
                 metadatos['Sample_rate'] = f"{sample_rate_val:.0f} Hz"
             except:
                 metadatos['Sample_rate'] = str(sample_rate)
         
-        frame_rate = getattr(audio_track, 'frame_rate', None)
+        frame_rate = td.get('frame_rate')
         if frame_rate:
             metadatos['Frame_rate'] = str(frame_rate)
         
-        duration = getattr(audio_track, 'duration', None)
+        duration = td.get('duration')
         if duration:
             try:
-                segundos = float(str(duration).replace(' ', '')) / 1000.0
+                metadatos['Duration_ms'] = _a_float(duration)
+                segundos = metadatos['Duration_ms'] / 1000.0
                 metadatos['Duration_sample'] = formato_tiempo_amigable(segundos)
             except:
                 metadatos['Duration_sample'] = str(duration)
         
-        spf = None
         frame_duration_ms = None
-        
-        tags = {}
-        try:
-            track_data = audio_track.to_data()
-            if isinstance(track_data, dict) and 'tag' in track_data:
-                tags = track_data['tag']
-            elif hasattr(audio_track, 'extra'):
-                tags = getattr(audio_track, 'extra', {})
-        except:
-            pass
-        
-        if tags and sample_rate_val:
-            spf_calculado = calcular_spf_preciso(tags, sample_rate_val)
-            if spf_calculado:
-                spf = spf_calculado
-                print(f"  SPF calculado desde NUMBER_OF_FRAMES/DURATION: {spf}")
-        
-        if not spf:
-            for attr_name in dir(audio_track):
-                if not attr_name.startswith('_'):
-                    attr_value = getattr(audio_track, attr_name)
-                    if attr_value and isinstance(attr_value, str):
-                        attr_lower = attr_name.lower()
-                        if any(keyword in attr_lower for keyword in ['sample_per_frame', 'samples_per_frame', 'spf']):
-                            try:
-                                spf = int(str(attr_value).replace(' ', ''))
-                                break
-                            except:
-                                pass
-            
-            if not spf and tags:
-                if isinstance(tags, dict):
-                    for key, value in tags.items():
-                        key_lower = str(key).lower()
-                        if any(keyword in key_lower for keyword in ['sample_per_frame', 'samples_per_frame', 'spf']):
-                            try:
-                                spf = int(str(value).replace(' ', ''))
-                                break
-                            except:
-                                pass
-                else:
-                    tags_str = str(tags)
-                    match = re.search(r'(?:sample_per_frame|samples_per_frame|spf)\s*[:=]?\s*(\d+)', 
-                                     tags_str, re.IGNORECASE)
-                    if match:
-                        try:
-                            spf = int(match.group(1))
-                        except:
-                            pass
-        
-        if not spf and frame_rate and sample_rate_val:
-            try:
-                frame_rate_str = str(frame_rate).replace(' ', '')
-                if '/' in frame_rate_str:
-                    num, den = map(int, frame_rate_str.split('/'))
-                    if den > 0:
-                        fps = num / den
-                else:
-                    fps = float(frame_rate_str)
-                
-                spf = int(sample_rate_val / fps)
-                print(f"  SPF calculado de frame rate: {sample_rate_val} / {fps} = {spf}")
-            except Exception as e:
-                print(f"  Error calculando SPF de frame rate: {e}")
-        
-        if not spf:
-            for attr_name in ['samples_per_frame', 'sample_per_frame', 'spf', 'nb_samples']:
-                attr_value = getattr(audio_track, attr_name, None)
-                if attr_value:
-                    try:
-                        spf = int(str(attr_value).replace(' ', ''))
-                        break
-                    except:
-                        pass
-        
-        if not spf and metadatos['Codec'] and any(codec in str(metadatos['Codec']).lower() 
-                                                 for codec in ['truehd', 'mlp']):
-            print(f"  Analizando Dolby TrueHD/MLP...")
-            if sample_rate_val == 48000:
-                spf = 40
-                print(f"  SPF asumido para TrueHD @ 48kHz: {spf}")
+        tags = td.get('tag') or td.get('extra') or {}
+        
+        # Estrategias en orden de prioridad; la primera que da SPF gana
+        # (para MKA bien muxeado suele ser NUMBER_OF_FRAMES/DURATION)
+        estrategias_spf = (
+            lambda: _spf_desde_numero_frames(tags, sample_rate_val),
+            lambda: _spf_desde_atributos(td),
+            lambda: _spf_desde_tags(tags),
+            lambda: _spf_desde_frame_rate(frame_rate, sample_rate_val),
+            lambda: _spf_desde_atributos_exactos(td),
+            lambda: _spf_truehd(metadatos['Codec'], sample_rate_val, mka_file),
+        )
+        spf = None
+        for estrategia in estrategias_spf:
+            spf = estrategia()
+            if spf:
+                break
         
         if spf and sample_rate_val:
             frame_duration_ms = (spf / sample_rate_val) * 1000
@@ -296,6 +551,8 @@ def obtener_metadatos_mediainfo(mka_file):
             
             print(f"  Cálculo final: ({spf} / {sample_rate_val}) × 1000 = {frame_duration_ms:.6f} ms")
             
+            _CACHE_METADATOS.guardar(clave_cache, metadatos)
+            
         elif sample_rate_val:
             print(f"\n  ERROR CRÍTICO: No se pudo determinar SPF")
             print(f"  Frame duration es REQUERIDO para el proceso")
@@ -319,10 +576,71 @@ def mostrar_metadatos(metadatos, nombre_archivo):
     print(f"METADATOS CONFIABLES (desde contenedor MKA): {nombre_archivo}")
     print(f"{'='*60}")
     for clave, valor in metadatos.items():
-        if clave != 'Frame_duration_ms':
+        if clave not in ('Frame_duration_ms', 'Duration_ms'):
             print(f"{clave:<18}: {valor}")
     print(f"{'='*60}")
 
+# Sufijos con que el pipeline nombra sus archivos temporales; una entrada
+# cuyo nombre ya termina así podría coincidir con una salida y no se enlaza
+_SUFIJOS_TEMPORALES = ("_temp", "_analisis", "_processed", "_delay", "_target", "_cortado", "_silencio")
+
+def _enlazar_matroska_existente(input_file, output_mka):
+    """
+    Si la entrada ya es MKA/MKV con un único track de audio (y nada más que
+    re-muxear), la enlaza (hardlink, o copia si no es posible) en lugar de
+    reescribir el contenedor con ffmpeg. Retorna True si lo hizo
+    """
+    input_path = Path(input_file)
+    if input_path.suffix.lower() not in ('.mka', '.mkv'):
+        return False
+    if input_path.stem.endswith(_SUFIJOS_TEMPORALES):
+        return False
+    
+    try:
+        tipos = [track.track_type for track in parsear_mediainfo(input_path).tracks]
+    except Exception:
+        return False
+    
+    # -map 0:a:0 descartaría video/subtítulos: solo se enlaza si no los hay
+    if tipos.count('Audio') != 1 or any(t not in ('General', 'Audio', 'Menu') for t in tipos):
+        return False
+    
+    try:
+        os.link(input_path, output_mka)
+        print(f"  Entrada ya es Matroska con un solo track de audio: enlazada sin re-muxear")
+    except OSError:
+        shutil.copy2(input_path, output_mka)
+        print(f"  Entrada ya es Matroska con un solo track de audio: copiada sin re-muxear")
+    return True
+
+def _stat_o_none(ruta):
+    """
+    os.stat de la ruta o None si no existe: un solo stat() reemplaza el par
+    exists() + stat()
+    """
+    try:
+        return os.stat(ruta)
+    except OSError:
+        return None
+
+# Opciones de salida comunes a los cortes/concatenaciones con stream copy
+_FFMPEG_COPIA = ("-c", "copy", "-map", "0", "-y", "-loglevel", "error")
+
+def _ejecutar_ffmpeg(cmd):
+    """
+    Ejecuta un comando ffmpeg que escribe a archivo (stdout descartado)
+    Retorna CompletedProcess; stderr contiene solo las últimas líneas,
+    que es donde ffmpeg reporta el error real (decodificadas solo si falló)
+    -nostdin: ffmpeg no configura ni lee la terminal (lotes en paralelo, daemon)
+    """
+    cmd = (cmd[0], "-nostdin", *cmd[1:])
+    cola_stderr = deque(maxlen=5)
+    with subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                          stderr=subprocess.PIPE) as proceso:
+        cola_stderr.extend(proceso.stderr)
+    stderr = b''.join(cola_stderr).decode('utf-8', errors='replace') if proceso.returncode else ''
+    return subprocess.CompletedProcess(cmd, proceso.returncode, None, stderr)
+
 def crear_mka_con_ffmpeg(input_file, output_mka):
     """
     PASO 1: Crear archivo MKA usando ffmpeg
@@ -330,6 +648,23 @@ def crear_mka_con_ffmpeg(input_file, output_mka):
     Propósito: Crear contenedor con metadatos confiables para análisis
     Método: Copia directa sin re-encoding (lossless)
     """
+    # La entrada ya es el MKA temporal (se pasó un archivo del directorio temporal)
+    if Path(input_file).resolve() == Path(output_mka).resolve():
+        print(f"  MKA ya presente: {output_mka.name}")
+        return True
+    
+    # Una salida previa puede ser un hardlink a la entrada de otra ejecución:
+    # ffmpeg -y la truncaría en sitio (y con ella al archivo original)
+    try:
+        output_mka.unlink()
+    except FileNotFoundError:
+        pass
+    
+    if _enlazar_matroska_existente(input_file, output_mka):
+        print(f"  MKA enlazado: {output_mka.name}")
+        print(f"  Tamaño: {output_mka.stat().st_size:,} bytes")
+        return True
+    
     print(f"  Creando MKA con ffmpeg...")
     
     cmd = [
@@ -343,15 +678,16 @@ def crear_mka_con_ffmpeg(input_file, output_mka):
     ]
     
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        result = _ejecutar_ffmpeg(cmd)
         
         if result.returncode != 0:
-            print(f"Error en ffmpeg: {result.stderr[:200]}")
+            print(f"Error en ffmpeg: {result.stderr[-200:]}")
             return False
         
-        if output_mka.exists() and output_mka.stat().st_size > 0:
+        st = _stat_o_none(output_mka)
+        if st and st.st_size > 0:
             print(f"  MKA creado: {output_mka.name}")
-            print(f"  Tamaño: {output_mka.stat().st_size:,} bytes")
+            print(f"  Tamaño: {st.st_size:,} bytes")
             return True
         else:
             print(f"Error: Archivo MKA no se creó correctamente")
@@ -364,89 +700,18 @@ def crear_mka_con_ffmpeg(input_file, output_mka):
         print(f"Error creando MKA: {e}")
         return False
 
-def convertir_mka_a_wav(mka_path, temp_dir):
-    """
-    PASO 3: Convertir archivo MKA a WAV para análisis de silencio
-    Herramienta: ffmpeg
-    Propósito: Crear formato PCM sin compresión para detección precisa de silencio
-    Parámetros: 16-bit PCM, mono, sin compresión DRC
-    """
-    wav_name = mka_path.stem + ".wav"
-    wav_path = temp_dir / wav_name
-    
-    print(f"Paso 3/5: Convirtiendo MKA a WAV (16-bit mono, sin compresión)...")
-    
-    cmd = [
-        "ffmpeg",
-        "-drc_scale", "0",
-        "-i", str(mka_path),
-        "-c:a", "pcm_s16le",
-        "-f", "wav",
-        "-rf64", "always",
-        "-ac", "1",
-        "-y",
-        "-loglevel", "error",
-        str(wav_path)
-    ]
-    
-    print(f"  Parámetros: 16-bit PCM, mono, sin compresión DRC")
-    
-    try:
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        
-        if result.returncode != 0:
-            print(f"Error en ffmpeg: {result.stderr[:200]}")
-            return None
-        
-        if wav_path.exists() and wav_path.stat().st_size > 0:
-            print(f"WAV creado: {wav_path.name}")
-            print(f"  Tamaño: {wav_path.stat().st_size:,} bytes")
-            return wav_path
-        else:
-            print(f"Error: Archivo WAV no se creó correctamente")
-            return None
-            
-    except FileNotFoundError:
-        print(f"Error: ffmpeg no encontrado")
-        return None
-    except Exception as e:
-        print(f"Error en conversión: {e}")
-        return None
-
 def calcular_duracion_ajustada(duracion_deseada_ms, frame_duration_ms, mostrar_ajuste=True):
     """
     Calcula la duración ajustada al múltiplo más cercano del frame duration
+    (mínimo 3 frames)
     """
     if frame_duration_ms <= 0:
         return duracion_deseada_ms
     
     frames_exactos = duracion_deseada_ms / frame_duration_ms
-    
-    frames_abajo = math.floor(frames_exactos)
-    frames_arriba = math.ceil(frames_exactos)
-    
-    if abs(frames_exactos - frames_abajo) < 0.000001:
-        frames_elegidos = frames_abajo
-    elif abs(frames_exactos - frames_arriba) < 0.000001:
-        frames_elegidos = frames_arriba
-    else:
-        duracion_abajo = frames_abajo * frame_duration_ms
-        duracion_arriba = frames_arriba * frame_duration_ms
-        
-        diff_abajo = abs(duracion_deseada_ms - duracion_abajo)
-        diff_arriba = abs(duracion_deseada_ms - duracion_arriba)
-        
-        if diff_abajo <= diff_arriba:
-            frames_elegidos = frames_abajo
-            duracion_ajustada_ms = duracion_abajo
-        else:
-            frames_elegidos = frames_arriba
-            duracion_ajustada_ms = duracion_arriba
-    
+    frames_elegidos = max(3, round(frames_exactos))
     duracion_ajustada_ms = frames_elegidos * frame_duration_ms
     
-    duracion_ajustada_ms = max(duracion_ajustada_ms, frame_duration_ms * 3)
-    
     if mostrar_ajuste and abs(duracion_deseada_ms - duracion_ajustada_ms) > 0.1:
         print(f"  Ajuste frame boundary:")
         print(f"    Deseado: {duracion_deseada_ms:.2f}ms ({frames_exactos:.3f} frames)")
@@ -455,6 +720,12 @@ def calcular_duracion_ajustada(duracion_deseada_ms, frame_duration_ms, mostrar_a
     
     return duracion_ajustada_ms
 
+def frame_mas_cercano(timecode_s, frame_duration_ms):
+    """
+    Índice (entero) del frame boundary más cercano al timecode
+    """
+    return round(timecode_s * 1000.0 / frame_duration_ms)
+
 def ajustar_timecode_a_boundary(timecode_s, frame_duration_ms):
     """
     Ajusta timecode al frame boundary más cercano
@@ -462,40 +733,44 @@ def ajustar_timecode_a_boundary(timecode_s, frame_duration_ms):
     if frame_duration_ms <= 0:
         return timecode_s
     
-    frame_duration_s = frame_duration_ms / 1000.0
-    frames_exactos = timecode_s / frame_duration_s
-    
-    frames_abajo = math.floor(frames_exactos)
-    frames_arriba = math.ceil(frames_exactos)
-    
-    timecode_abajo = frames_abajo * frame_duration_s
-    timecode_arriba = frames_arriba * frame_duration_s
-    
-    if abs(timecode_s - timecode_abajo) <= abs(timecode_s - timecode_arriba):
-        return timecode_abajo
-    else:
-        return timecode_arriba
+    return frame_mas_cercano(timecode_s, frame_duration_ms) * frame_duration_ms / 1000.0
+
+def _limite_duracion(duracion_minima_s):
+    """
+    Duración mínima comparable con silence_duration: mismo redondeo que el
+    parámetro d= de silencedetect y tolerancia para los 6 dígitos
+    significativos con que ffmpeg imprime la duración
+    """
+    return float(f"{duracion_minima_s:.3f}") - 0.000001
 
-def parsear_salida_silencedetect(salida_ffmpeg, umbral_db):
+def parsear_salida_silencedetect(lineas, umbral_db, duracion_suficiente_s=None):
     """
-    Parsea la salida de ffmpeg silencedetect
+    Parsea la salida de ffmpeg silencedetect (texto completo o iterable de líneas)
+    Con duracion_suficiente_s deja de leer en el primer segmento que la alcanza
     """
-    patron_start = re.compile(r'\[silencedetect[^\]]*\]\s+silence_start:\s*(\d+\.?\d*)')
-    patron_end = re.compile(r'\[silencedetect[^\]]*\]\s+silence_end:\s*(\d+\.?\d*)\s*\|\s*silence_duration:\s*(\d+\.?\d*)')
+    if isinstance(lineas, str):
+        # Texto completo: un solo finditer, sin partir en líneas
+        coincidencias = _RE_SILENCEDETECT.finditer(lineas)
+    else:
+        # Stream: una búsqueda por línea, solo en las líneas de silencedetect
+        coincidencias = (_RE_SILENCEDETECT.search(linea) for linea in lineas if 'silence_' in linea)
+    
+    limite = _limite_duracion(duracion_suficiente_s) if duracion_suficiente_s else None
     
     segmentos = []
     inicio_pendiente = None
     
-    for linea in salida_ffmpeg.split('\n'):
-        match_start = patron_start.search(linea)
-        if match_start:
-            inicio_pendiente = float(match_start.group(1))
+    for match in coincidencias:
+        if match is None:
             continue
         
-        match_end = patron_end.search(linea)
-        if match_end and inicio_pendiente is not None:
-            fin = float(match_end.group(1))
-            duracion = float(match_end.group(2))
+        if match.group(1) is not None:
+            inicio_pendiente = float(match.group(1))
+            continue
+        
+        if inicio_pendiente is not None:
+            fin = float(match.group(2))
+            duracion = float(match.group(3))
             
             segmentos.append({
                 'inicio': inicio_pendiente,
@@ -505,6 +780,10 @@ def parsear_salida_silencedetect(salida_ffmpeg, umbral_db):
             })
             
             inicio_pendiente = None
+            
+            if limite is not None and duracion >= limite:
+                print(f"  Segmento suficiente con {umbral_db}dB tras {len(segmentos)} segmento(s), análisis detenido")
+                return segmentos
     
     if segmentos:
         print(f"  Encontrados {len(segmentos)} segmentos con {umbral_db}dB")
@@ -513,29 +792,99 @@ def parsear_salida_silencedetect(salida_ffmpeg, umbral_db):
     
     return segmentos
 
-def detectar_silencio_ffmpeg(archivo_wav, umbral_db, duracion_minima_segundos):
+def detectar_silencio_ffmpeg(archivo_audio, umbral_db, duracion_minima_segundos, duracion_suficiente_s=None):
     """
     Detecta segmentos de silencio usando ffmpeg silencedetect
+    Decodifica el audio directamente (sin WAV intermedio) y lo lleva a PCM
+    16-bit mono dentro del filtergraph, sin compresión DRC
+    stderr se parsea mientras ffmpeg decodifica; si se indica
+    duracion_suficiente_s, ffmpeg se detiene al encontrar ese segmento
     """
+    # Solo se decodifica el primer stream de audio (el mismo que usa el resto
+    # del pipeline); video, subtítulos y pistas extra no pasan por decoder.
+    # Sin banner ni progreso: stderr queda casi solo con líneas de silencedetect
     comando = [
-        'ffmpeg', '-i', str(archivo_wav),
-        '-af', f'silencedetect=noise={umbral_db}dB:d={duracion_minima_segundos:.3f}',
+        'ffmpeg', '-nostdin', '-hide_banner', '-nostats', '-drc_scale', '0',
+        '-i', str(archivo_audio), '-map', '0:a:0',
+        '-af', f'aformat=sample_fmts=s16:channel_layouts=mono,'
+               f'silencedetect=noise={umbral_db}dB:d={duracion_minima_segundos:.3f}',
         '-f', 'null', '-'
     ]
     
-    try:
-        resultado = subprocess.run(comando, capture_output=True, text=True, check=True)
-        return parsear_salida_silencedetect(resultado.stderr, umbral_db)
-    except subprocess.CalledProcessError as e:
-        print(f"  Error en ffmpeg ({umbral_db}dB): {e.stderr[:200]}")
+    # Últimas líneas de stderr, solo para el mensaje de error
+    cola_stderr = deque(maxlen=5)
+    
+    def lineas_stderr(stream):
+        # stderr en bytes: solo se decodifican las líneas de silencedetect
+        for linea in stream:
+            cola_stderr.append(linea)
+            if b'silence_' in linea:
+                yield linea.decode('utf-8', errors='replace')
+    
+    with subprocess.Popen(comando, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                          bufsize=1 << 20) as proceso:
+        segmentos = parsear_salida_silencedetect(
+            lineas_stderr(proceso.stderr), umbral_db, duracion_suficiente_s
+        )
+        
+        if (duracion_suficiente_s and segmentos
+                and segmentos[-1]['duracion'] >= _limite_duracion(duracion_suficiente_s)):
+            # Salida anticipada: el resto del archivo no hace falta
+            proceso.terminate()
+            return segmentos
+    
+    if proceso.returncode != 0:
+        print(f"  Error en ffmpeg ({umbral_db}dB): {b''.join(cola_stderr).decode('utf-8', errors='replace')[-200:]}")
         return None
+    
+    return segmentos
+
+def _detectar_silencio_cacheado(archivo_audio, umbral_db, duracion_minima_segundos, duracion_suficiente_s,
+                                clave_origen=None):
+    """
+    detectar_silencio_ffmpeg con la caché persistente de silencedetect: la
+    misma pasada (entrada sin cambios, umbral, d= y corte anticipado) sobre
+    una entrada ya analizada en otra ejecución no vuelve a lanzar ffmpeg
+    clave_origen: _clave_cache_silencedetect de la entrada del usuario de la
+    que sale archivo_audio; sin ella no se usa la caché
+    """
+    clave = None
+    if clave_origen is not None:
+        clave = (f"{clave_origen}|silencedetect:"
+                 f"{umbral_db}:{duracion_minima_segundos:.3f}:{duracion_suficiente_s:.3f}")
+    
+    if clave is not None:
+        cacheados = _CACHE_SILENCEDETECT.cargar(clave)
+        if cacheados is not None:
+            print(f"  Segmentos desde caché con {umbral_db}dB: {len(cacheados)}")
+            return cacheados
+    
+    segmentos = detectar_silencio_ffmpeg(
+        archivo_audio, umbral_db, duracion_minima_segundos, duracion_suficiente_s
+    )
+    if segmentos is not None and clave is not None:
+        _CACHE_SILENCEDETECT.guardar(clave, segmentos)
+    return segmentos
 
-def buscar_silencio_estrategia_escalonada(archivo_wav, frame_duration_ms):
+def _primer_segmento_con_duracion(segmentos, duracion_minima_s):
     """
-    PASO 4: Busca segmentos de silencio usando estrategia 500ms → 400ms → 300ms
+    Primer segmento (en orden temporal) que dura al menos duracion_minima_s
+    """
+    limite = _limite_duracion(duracion_minima_s)
+    for segmento in segmentos:
+        if segmento['duracion'] >= limite:
+            return segmento
+    return None
+
+def buscar_silencio_estrategia_escalonada(archivo_audio, frame_duration_ms, origen=None):
+    """
+    Busca segmentos de silencio usando estrategia 500ms → 400ms → 300ms
     Herramienta: ffmpeg silencedetect
     Propósito: Encontrar segmento de silencio adecuado para extraer
     Estrategia: Fase 1 (umbrales sensibles) → Fase 2 (umbrales menos sensibles)
+    Cada umbral se analiza una sola vez con la duración más corta; las
+    duraciones mayores se filtran sobre esos mismos segmentos
+    origen: entrada del usuario de la que sale archivo_audio (caché persistente)
     """
     print("\n" + "="*60)
     print("ANÁLISIS DE SILENCIOS (Estrategia 500ms → 400ms → 300ms)")
@@ -550,20 +899,37 @@ def buscar_silencio_estrategia_escalonada(archivo_wav, frame_duration_ms):
     print(f"  Fase 1 (umbrales sensibles): {', '.join(map(str, umbrales_fase1))} dB")
     print(f"  Fase 2 (umbrales menos sensibles): {', '.join(map(str, umbrales_fase2))} dB")
     
+    # Duraciones ajustadas a frames, calculadas una vez para ambas fases
+    # (solo el ajuste de la primera se muestra)
+    duraciones_ajustadas = {
+        d: calcular_duracion_ajustada(d, frame_duration_ms, mostrar_ajuste=(d == duraciones_ms[0]))
+        for d in duraciones_ms
+    }
+    
+    # Un silencio que supera 500ms también supera 300ms: una pasada de ffmpeg
+    # por umbral (con d= mínimo) contiene los segmentos de todas las duraciones
+    duracion_pasada_s = duraciones_ajustadas[min(duraciones_ms)] / 1000.0
+    # Y el primer segmento que alcanza la duración mayor cierra la búsqueda
+    # para ese umbral: cualquier duración menor ya aparece antes o en él
+    duracion_suficiente_s = duraciones_ajustadas[max(duraciones_ms)] / 1000.0
+    segmentos_por_umbral = {}
+    # Identidad de la entrada (lee hasta 1 MiB): una vez para todos los umbrales
+    clave_origen = _clave_cache_silencedetect(origen) if origen else None
+    
     print(f"\n--- FASE 1: Buscando con umbrales sensibles ---")
     for duracion_obj in duraciones_ms:
-        mostrar_ajuste = (duracion_obj == duraciones_ms[0])
-        duracion_ajustada_ms = calcular_duracion_ajustada(
-            duracion_obj, frame_duration_ms, mostrar_ajuste=mostrar_ajuste
-        )
+        duracion_ajustada_ms = duraciones_ajustadas[duracion_obj]
         duracion_ajustada_s = duracion_ajustada_ms / 1000.0
         
         print(f"\nProbando {duracion_obj}ms (ajustado a frames: {duracion_ajustada_ms:.2f}ms):")
         
         for umbral in umbrales_fase1:
-            segmentos = detectar_silencio_ffmpeg(archivo_wav, umbral, duracion_ajustada_s)
-            if segmentos:
-                primer_segmento = segmentos[0]
+            if umbral not in segmentos_por_umbral:
+                segmentos_por_umbral[umbral] = _detectar_silencio_cacheado(
+                    archivo_audio, umbral, duracion_pasada_s, duracion_suficiente_s, clave_origen
+                ) or []
+            primer_segmento = _primer_segmento_con_duracion(segmentos_por_umbral[umbral], duracion_ajustada_s)
+            if primer_segmento:
                 print(f"    Silencio encontrado: {primer_segmento['duracion']:.3f}s "
                       f"a {primer_segmento['umbral']}dB "
                       f"(inicio: {primer_segmento['inicio']:.2f}s)")
@@ -571,17 +937,18 @@ def buscar_silencio_estrategia_escalonada(archivo_wav, frame_duration_ms):
     
     print(f"\n--- FASE 2: Buscando con umbrales menos sensibles ---")
     for duracion_obj in duraciones_ms:
-        duracion_ajustada_ms = calcular_duracion_ajustada(
-            duracion_obj, frame_duration_ms, mostrar_ajuste=False
-        )
+        duracion_ajustada_ms = duraciones_ajustadas[duracion_obj]
         duracion_ajustada_s = duracion_ajustada_ms / 1000.0
         
         print(f"\nProbando {duracion_obj}ms (ajustado a frames: {duracion_ajustada_ms:.2f}ms):")
         
         for umbral in umbrales_fase2:
-            segmentos = detectar_silencio_ffmpeg(archivo_wav, umbral, duracion_ajustada_s)
-            if segmentos:
-                primer_segmento = segmentos[0]
+            if umbral not in segmentos_por_umbral:
+                segmentos_por_umbral[umbral] = _detectar_silencio_cacheado(
+                    archivo_audio, umbral, duracion_pasada_s, duracion_suficiente_s, clave_origen
+                ) or []
+            primer_segmento = _primer_segmento_con_duracion(segmentos_por_umbral[umbral], duracion_ajustada_s)
+            if primer_segmento:
                 print(f"    Silencio encontrado: {primer_segmento['duracion']:.3f}s "
                       f"a {primer_segmento['umbral']}dB "
                       f"(inicio: {primer_segmento['inicio']:.2f}s)")
@@ -590,13 +957,14 @@ def buscar_silencio_estrategia_escalonada(archivo_wav, frame_duration_ms):
     print("\nNo se encontraron segmentos de silencio en ningún umbral/duración")
     return None, None, None, None
 
-def analizar_silencios_wav(wav_path, frame_duration_ms):
+def analizar_silencios(mka_path, frame_duration_ms, origen=None):
     """
-    Analiza silencios en archivo WAV y genera timecodes ajustados
+    PASO 3: Analiza silencios directamente en el MKA y genera timecodes ajustados
+    origen: entrada del usuario de la que se creó el MKA (caché persistente)
     """
-    print(f"\nPaso 4/5: Analizando silencios en WAV...")
+    print(f"\nPaso 3/4: Analizando silencios en MKA (silencedetect, 16-bit mono)...")
     
-    segmento, duracion_objetivo_ms, duracion_objetivo_ajustada_ms, umbral_encontrado = buscar_silencio_estrategia_escalonada(wav_path, frame_duration_ms)
+    segmento, duracion_objetivo_ms, duracion_objetivo_ajustada_ms, umbral_encontrado = buscar_silencio_estrategia_escalonada(mka_path, frame_duration_ms, origen)
     
     if not segmento:
         return None
@@ -604,10 +972,14 @@ def analizar_silencios_wav(wav_path, frame_duration_ms):
     inicio_original = segmento['inicio']
     fin_original = segmento['fin']
     
-    inicio_ajustado = ajustar_timecode_a_boundary(inicio_original, frame_duration_ms)
-    fin_ajustado = ajustar_timecode_a_boundary(fin_original, frame_duration_ms)
+    # Boundaries como índices enteros de frame: la duración es una resta exacta
+    # y los segundos se derivan una sola vez de cada índice
+    frame_inicio = frame_mas_cercano(inicio_original, frame_duration_ms)
+    frame_fin = frame_mas_cercano(fin_original, frame_duration_ms)
     
-    duracion_ajustada_s = fin_ajustado - inicio_ajustado
+    inicio_ajustado = frame_inicio * frame_duration_ms / 1000.0
+    fin_ajustado = frame_fin * frame_duration_ms / 1000.0
+    duracion_ajustada_s = (frame_fin - frame_inicio) * frame_duration_ms / 1000.0
     
     resultado = {
         'duracion_objetivo_ms': duracion_objetivo_ms,
@@ -632,8 +1004,8 @@ def analizar_silencios_wav(wav_path, frame_duration_ms):
         
         'frames_inicio_original': inicio_original / (frame_duration_ms / 1000),
         'frames_fin_original': fin_original / (frame_duration_ms / 1000),
-        'frames_inicio_ajustado': inicio_ajustado / (frame_duration_ms / 1000),
-        'frames_fin_ajustado': fin_ajustado / (frame_duration_ms / 1000),
+        'frames_inicio_ajustado': frame_inicio,
+        'frames_fin_ajustado': frame_fin,
     }
     
     return resultado
@@ -673,13 +1045,13 @@ def mostrar_resultado_silencios(resultado, nombre_archivo):
     print(f"  Duración: {resultado['diferencia_duracion_ms']:+.3f} ms")
     
     frames_originales = resultado['duracion_original_ms'] / resultado['frame_duration_ms']
-    frames_ajustados = resultado['duracion_ajustada_ms'] / resultado['frame_duration_ms']
+    frames_ajustados = resultado['frames_fin_ajustado'] - resultado['frames_inicio_ajustado']
     
     print(f"\nINFORMACIÓN DE FRAMES:")
     print(f"  Frames originales: {frames_originales:.2f}")
-    print(f"  Frames ajustados: {frames_ajustados:.2f}")
-    print(f"  Frames inicio ajustado: {resultado['frames_inicio_ajustado']:.2f}")
-    print(f"  Frames fin ajustado: {resultado['frames_fin_ajustado']:.2f}")
+    print(f"  Frames ajustados: {frames_ajustados}")
+    print(f"  Frames inicio ajustado: {resultado['frames_inicio_ajustado']}")
+    print(f"  Frames fin ajustado: {resultado['frames_fin_ajustado']}")
     
     inicio_formato = formato_tiempo_amigable(resultado['inicio_ajustado_s'])
     fin_formato = formato_tiempo_amigable(resultado['fin_ajustado_s'])
@@ -698,45 +1070,31 @@ def mostrar_resultado_silencios(resultado, nombre_archivo):
     
     print(f"{'='*60}")
 
-def segundos_a_formato_ffmpeg(segundos):
-    """
-    Convierte segundos a formato HH:MM:SS.mmm para ffmpeg
-    """
-    horas = int(segundos // 3600)
-    minutos = int((segundos % 3600) // 60)
-    segs = segundos % 60
-    
-    return f"{horas:02d}:{minutos:02d}:{segs:06.3f}"
-
 def extraer_segmento_ffmpeg(mka_path, inicio_s, fin_s, output_path):
     """
-    Extrae segmento usando ffmpeg -ss inicio -t duracion -c copy
+    Extrae segmento usando ffmpeg -ss inicio -i ... -t duracion -c copy
+    -ss va antes de -i: el demuxer salta directo al inicio en lugar de leer
+    y descartar todos los paquetes previos
     NOTA: ffmpeg con -y sobrescribe automáticamente si el archivo existe
     """
     duracion_s = fin_s - inicio_s
     
-    inicio_formato = segundos_a_formato_ffmpeg(inicio_s)
-    
-    cmd = [
+    cmd = (
         "ffmpeg",
+        "-ss", f"{inicio_s:.6f}",
         "-i", str(mka_path),
-        "-ss", inicio_formato,
         "-t", f"{duracion_s:.6f}",
-        "-c", "copy",
-        "-map", "0",
-        "-y",
-        "-loglevel", "error",
-        str(output_path)
-    ]
+    ) + _FFMPEG_COPIA + (str(output_path),)
     
     print(f"  Comando ffmpeg: -ss {inicio_s:.3f}s -t {duracion_s:.3f}s -c copy")
     print(f"  Extracción: {inicio_s:.3f}s a {fin_s:.3f}s ({duracion_s:.3f}s)")
     
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        result = _ejecutar_ffmpeg(cmd)
         
         if result.returncode == 0:
-            if output_path.exists() and output_path.stat().st_size > 0:
+            st = _stat_o_none(output_path)
+            if st and st.st_size > 0:
                 return output_path
             else:
                 print(f"  Error: Archivo no se creó o está vacío")
@@ -744,7 +1102,7 @@ def extraer_segmento_ffmpeg(mka_path, inicio_s, fin_s, output_path):
         else:
             print(f"  Error ffmpeg (código {result.returncode}):")
             if result.stderr:
-                print(f"    {result.stderr[:200]}")
+                print(f"    {result.stderr[-200:]}")
             return None
             
     except Exception as e:
@@ -753,12 +1111,12 @@ def extraer_segmento_ffmpeg(mka_path, inicio_s, fin_s, output_path):
 
 def extraer_silencio_del_mka(mka_path, resultado_silencios, temp_dir):
     """
-    PASO 5: Extrae el segmento de silencio del MKA usando ffmpeg
+    PASO 4: Extrae el segmento de silencio del MKA usando ffmpeg
     Herramienta: ffmpeg
     Propósito: Extraer silencio identificado para usarlo en delays positivos
     Característica: Timecodes exactos alineados a frame boundaries
     """
-    print(f"\nPaso 5/5: Extrayendo segmento de silencio del MKA...")
+    print(f"\nPaso 4/4: Extrayendo segmento de silencio del MKA...")
     
     if not resultado_silencios:
         print("  No hay resultados de silencio para extraer")
@@ -766,28 +1124,14 @@ def extraer_silencio_del_mka(mka_path, resultado_silencios, temp_dir):
     
     inicio = resultado_silencios['inicio_ajustado_s']
     fin = resultado_silencios['fin_ajustado_s']
-    duracion_s = fin - inicio
     frame_duration_ms = resultado_silencios['frame_duration_ms']
-    frame_duration_s = frame_duration_ms / 1000.0
-    
-    frames_exactos = duracion_s / frame_duration_s
-    frames_enteros = round(frames_exactos)
-    
-    if abs(frames_exactos - frames_enteros) > 0.000001:
-        duracion_ajustada_s = frames_enteros * frame_duration_s
-        fin = inicio + duracion_ajustada_s
-        print(f"  Ajuste de duración a frame exacto:")
-        print(f"    Original: {duracion_s:.6f}s ({frames_exactos:.3f} frames)")
-        print(f"    Ajustado: {duracion_ajustada_s:.6f}s ({frames_enteros} frames)")
-        print(f"    Diferencia: {(duracion_ajustada_s - duracion_s)*1000:+.3f} ms")
-        duracion_s = duracion_ajustada_s
     
+    # analizar_silencios ya alineó ambos extremos a índices enteros de frame
+    frames_enteros = resultado_silencios['frames_fin_ajustado'] - resultado_silencios['frames_inicio_ajustado']
+    duracion_s = resultado_silencios['duracion_ajustada_s']
     duracion_ms = duracion_s * 1000
     
-    nombre_base = Path(mka_path).stem
-    for sufijo in ["_analisis", "_temp", "_processed"]:
-        if nombre_base.endswith(sufijo):
-            nombre_base = nombre_base[:-len(sufijo)]
+    nombre_base = _RE_SUFIJOS_MKA.sub('', Path(mka_path).stem)
     
     silencio_mka = temp_dir / f"{nombre_base}_silencio.mka"
     
@@ -798,23 +1142,22 @@ def extraer_silencio_del_mka(mka_path, resultado_silencios, temp_dir):
     
     archivo_silencio = extraer_segmento_ffmpeg(mka_path, inicio, fin, silencio_mka)
     
-    if archivo_silencio and archivo_silencio.exists():
-        tamaño = archivo_silencio.stat().st_size
+    st_silencio = _stat_o_none(archivo_silencio) if archivo_silencio else None
+    if st_silencio:
+        tamaño = st_silencio.st_size
         
         try:
-            media_info = MediaInfo.parse(str(archivo_silencio))
-            for track in media_info.tracks:
-                if track.track_type == 'Audio' and hasattr(track, 'duration'):
-                    duracion_real_ms = float(str(track.duration).replace(' ', ''))
-                    duracion_real_s = duracion_real_ms / 1000.0
-                    print(f"  Silencio extraído: {tamaño:,} bytes")
-                    print(f"  Duración real verificada: {duracion_real_s:.6f}s ({duracion_real_ms:.3f} ms)")
-                    
-                    resultado_silencios['duracion_ajustada_s'] = duracion_real_s
-                    resultado_silencios['duracion_ajustada_ms'] = duracion_real_ms
-                    resultado_silencios['fin_ajustado_s'] = inicio + duracion_real_s
-                    
-                    return archivo_silencio
+            duracion_real_ms = duracion_audio_ms(archivo_silencio)
+            if duracion_real_ms is not None:
+                duracion_real_s = duracion_real_ms / 1000.0
+                print(f"  Silencio extraído: {tamaño:,} bytes")
+                print(f"  Duración real verificada: {duracion_real_s:.6f}s ({duracion_real_ms:.3f} ms)")
+                
+                resultado_silencios['duracion_ajustada_s'] = duracion_real_s
+                resultado_silencios['duracion_ajustada_ms'] = duracion_real_ms
+                resultado_silencios['fin_ajustado_s'] = inicio + duracion_real_s
+                
+                return archivo_silencio
         except:
             pass
         
@@ -824,6 +1167,230 @@ def extraer_silencio_del_mka(mka_path, resultado_silencios, temp_dir):
     print("  No se pudo extraer el segmento de silencio")
     return None
 
+# Encoders PCM de ffmpeg por (codec ID de Matroska, bit depth)
+_ENCODERS_PCM = {
+    ('A_PCM/INT/LIT', 8): 'pcm_u8',
+    ('A_PCM/INT/LIT', 16): 'pcm_s16le',
+    ('A_PCM/INT/LIT', 24): 'pcm_s24le',
+    ('A_PCM/INT/LIT', 32): 'pcm_s32le',
+    ('A_PCM/INT/BIG', 16): 'pcm_s16be',
+    ('A_PCM/INT/BIG', 24): 'pcm_s24be',
+    ('A_PCM/INT/BIG', 32): 'pcm_s32be',
+    ('A_PCM/FLOAT/IEEE', 32): 'pcm_f32le',
+    ('A_PCM/FLOAT/IEEE', 64): 'pcm_f64le',
+}
+
+def _encoder_pcm(mka_path):
+    """
+    Encoder PCM de ffmpeg equivalente al track de audio del MKA
+    Retorna (encoder, datos_del_track) o (None, None) si no es PCM soportado
+    """
+    try:
+        td = primer_track_audio(parsear_mediainfo(mka_path)).to_data()
+        encoder = _ENCODERS_PCM.get((td.get('codec_id'), td.get('bit_depth')))
+    except Exception:
+        return None, None
+    
+    return (encoder, td) if encoder else (None, None)
+
+def generar_silencio_pcm(mka_path, frame_duration_ms, temp_dir):
+    """
+    Para audio PCM genera el silencio base en lugar de buscarlo: los primeros
+    ~500ms del propio audio con volume=0, re-codificados con el mismo encoder
+    PCM (ceros digitales, mismos sample rate/canales/formato que el original)
+    Retorna (archivo, duracion_ms) o None si el codec no es PCM soportado
+    """
+    encoder, td = _encoder_pcm(mka_path)
+    if not encoder:
+        return None
+    
+    duracion_ms = calcular_duracion_ajustada(500, frame_duration_ms, mostrar_ajuste=False)
+    
+    nombre_base = _RE_SUFIJOS_MKA.sub('', Path(mka_path).stem)
+    silencio_mka = temp_dir / f"{nombre_base}_silencio.mka"
+    
+    print(f"  Audio PCM ({td.get('codec_id')}, {td.get('bit_depth')}-bit): generando silencio digital")
+    print(f"  Duración: {duracion_ms:.3f} ms ({encoder}) → {silencio_mka.name}")
+    
+    cmd = [
+        "ffmpeg",
+        "-i", str(mka_path),
+        "-map", "0:a:0",
+        "-t", f"{duracion_ms / 1000:.6f}",
+        "-af", "volume=0",
+        "-c:a", encoder,
+        "-y",
+        "-loglevel", "error",
+        str(silencio_mka)
+    ]
+    
+    result = _ejecutar_ffmpeg(cmd)
+    st = _stat_o_none(silencio_mka)
+    if result.returncode != 0 or not st or st.st_size == 0:
+        print(f"  No se pudo generar el silencio ({result.stderr[-200:].strip()}); se buscará en el audio")
+        return None
+    
+    return silencio_mka, duracion_ms
+
+def aplicar_delay_pcm(mka_path, delay_ms, relleno_ms, frame_duration_ms, output_path, duracion_max_s=None):
+    """
+    Para audio PCM agrega silencio al inicio (delay positivo) o descarta el
+    inicio (delay negativo) y/o agrega silencio al final (relleno para
+    target) en una sola pasada de ffmpeg: adelay/atrim/apad con el número
+    exacto de muestras, re-codificado con el mismo encoder PCM (sin pérdida),
+    en lugar de extraer silencio, crear segmentos y concatenarlos
+    duracion_max_s: si se indica, también corta el final (target menor)
+    Retorna (archivo, delay_real_ms, relleno_real_ms) o (None, None, None)
+    si no aplica o falla
+    """
+    encoder, td = _encoder_pcm(mka_path)
+    if not encoder:
+        return None, None, None
+    
+    try:
+        sample_rate = _a_float(td.get('sampling_rate'))
+    except ValueError:
+        return None, None, None
+    
+    delay_real_ms = relleno_real_ms = 0.0
+    muestras_delay = muestras_relleno = 0
+    if delay_ms != 0:
+        delay_real_ms, frames_delay, _ = ajustar_delay_a_frames(delay_ms, frame_duration_ms)
+        muestras_delay = round(abs(delay_real_ms) * sample_rate / 1000.0)
+    if relleno_ms > 0:
+        relleno_real_ms, frames_relleno, _ = ajustar_delay_a_frames(relleno_ms, frame_duration_ms)
+        muestras_relleno = round(relleno_real_ms * sample_rate / 1000.0)
+    
+    filtros = []
+    if muestras_delay > 0 and delay_real_ms > 0:
+        filtros.append(f"adelay=delays={muestras_delay}S:all=1")
+    elif muestras_delay > 0:
+        # Delay negativo: se descartan las primeras muestras
+        filtros.append(f"atrim=start_sample={muestras_delay},asetpts=PTS-STARTPTS")
+    if muestras_relleno > 0:
+        filtros.append(f"apad=pad_len={muestras_relleno}")
+    if duracion_max_s is not None:
+        muestras_max = round(duracion_max_s * sample_rate)
+        if muestras_max <= 0:
+            return None, None, None
+        filtros.append(f"atrim=end_sample={muestras_max}")
+    if not filtros:
+        return None, None, None
+    
+    print(f"  Audio PCM ({td.get('codec_id')}, {td.get('bit_depth')}-bit): silencio directo con ffmpeg")
+    if muestras_delay > 0:
+        print(f"  Delay: {delay_real_ms:+.2f} ms ({abs(frames_delay)} frames, {muestras_delay} muestras)")
+    if muestras_relleno > 0:
+        print(f"  Relleno: {relleno_real_ms:.2f} ms ({frames_relleno} frames, {muestras_relleno} muestras)")
+    if duracion_max_s is not None:
+        print(f"  Duración máxima: {duracion_max_s:.6f} s ({muestras_max} muestras)")
+    
+    cmd = [
+        "ffmpeg",
+        "-i", str(mka_path),
+        "-map", "0:a:0",
+        "-af", ",".join(filtros),
+        "-c:a", encoder,
+        "-y",
+        "-loglevel", "error",
+        str(output_path)
+    ]
+    
+    result = _ejecutar_ffmpeg(cmd)
+    st = _stat_o_none(output_path)
+    if result.returncode != 0 or not st or st.st_size == 0:
+        print(f"  No se pudo aplicar el silencio con ffmpeg ({result.stderr[-200:].strip()}); se usarán segmentos")
+        return None, None, None
+    
+    print(f"  Archivo creado: {output_path.name} ({st.st_size:,} bytes)")
+    return output_path, delay_real_ms, relleno_real_ms
+
+def rellenar_pcm_al_final(mka_path, relleno_ms, frame_duration_ms, output_path):
+    """
+    Para audio PCM agrega silencio al final en una sola pasada de ffmpeg
+    (ver aplicar_delay_pcm)
+    Retorna (archivo, relleno_real_ms) o (None, None) si no aplica o falla
+    """
+    archivo, _, relleno_real_ms = aplicar_delay_pcm(mka_path, 0, relleno_ms, frame_duration_ms, output_path)
+    return archivo, relleno_real_ms
+
+# tmpfs para el silencio base y sus segmentos (pequeños, releídos en cada concat)
+_DIR_TMPFS = Path("/dev/shm")
+_MIN_LIBRE_TMPFS = 64 << 20
+
+# Directorio tmpfs de la ejecución en curso por temp_dir (ver limpiar_silencios)
+_DIRS_SILENCIOS = {}
+
+def directorio_silencios(temp_dir):
+    """
+    Directorio para el silencio base y sus segmentos: en tmpfs (/dev/shm)
+    cuando existe y tiene espacio libre, si no el propio temp_dir
+    Solo los silencios van a RAM: el MKA y la salida final pueden ocupar GB
+    El directorio tmpfs es propio de esta ejecución (mkdtemp, modo 0700) y
+    se elimina con limpiar_silencios al terminar el archivo
+    """
+    destino = _DIRS_SILENCIOS.get(temp_dir)
+    if destino is not None:
+        return destino
+    
+    if _DIR_TMPFS.is_dir():
+        try:
+            st = os.statvfs(_DIR_TMPFS)
+            if st.f_bavail * st.f_frsize >= _MIN_LIBRE_TMPFS:
+                destino = Path(tempfile.mkdtemp(prefix="delay_fix_", dir=_DIR_TMPFS))
+                _DIRS_SILENCIOS[temp_dir] = destino
+                return destino
+        except OSError:
+            pass
+    return temp_dir
+
+def limpiar_silencios(temp_dir):
+    """
+    Elimina el directorio tmpfs de silencios de temp_dir (si se creó) y
+    olvida los segmentos parciales que apuntaban a él: lo que queda en
+    /dev/shm ocupa RAM hasta el próximo reinicio
+    """
+    destino = _DIRS_SILENCIOS.pop(temp_dir, None)
+    if destino is None:
+        return
+    
+    for clave, archivo in list(_SEGMENTOS_PARCIALES.items()):
+        if archivo.parent == destino:
+            del _SEGMENTOS_PARCIALES[clave]
+    shutil.rmtree(destino, ignore_errors=True)
+
+def crear_silencio_base(mka_path, frame_duration_ms, temp_dir, nombre_archivo=None, origen=None):
+    """
+    Obtiene el archivo base de silencio para delays/targets positivos:
+    generado para PCM, analizado y extraído del propio audio para el resto
+    (códecs con frames comprimidos, TrueHD/MLP incluidos, no admiten un
+    silencio re-codificado sin perder el stream copy)
+    nombre_archivo: si se indica, muestra el resultado del análisis
+    origen: entrada del usuario de la que se creó mka_path; solo para un MKA
+    sin cambios (caché persistente de silencedetect)
+    Retorna (archivo_silencio, duracion_silencio_ms) o (None, None)
+    """
+    temp_dir = directorio_silencios(temp_dir)
+    
+    silencio_generado = generar_silencio_pcm(mka_path, frame_duration_ms, temp_dir)
+    if silencio_generado:
+        return silencio_generado
+    
+    resultado_silencios = analizar_silencios(mka_path, frame_duration_ms, origen)
+    if not resultado_silencios:
+        print(f"Error: No se encontraron silencios adecuados")
+        return None, None
+    
+    if nombre_archivo:
+        mostrar_resultado_silencios(resultado_silencios, nombre_archivo)
+    
+    archivo_silencio = extraer_silencio_del_mka(mka_path, resultado_silencios, temp_dir)
+    if not archivo_silencio or not archivo_silencio.exists():
+        print(f"Error: No se pudo extraer el segmento de silencio")
+        return None, None
+    
+    return archivo_silencio, resultado_silencios['duracion_ajustada_ms']
+
 def parsear_delay(delay_str):
     """
     Parsea el valor de delay con flexibilidad de formato
@@ -832,35 +1399,15 @@ def parsear_delay(delay_str):
     if not delay_str:
         return None
     
-    delay_str = delay_str.strip().lower()
-    
-    es_negativo = delay_str.startswith('-')
-    if es_negativo:
-        delay_str = delay_str[1:]
-    
-    delay_str = delay_str.replace(' ', '')
+    match = _RE_DELAY.fullmatch(delay_str.strip().lower().replace(' ', ''))
+    if not match:
+        return None
     
-    if delay_str.endswith('ms'):
-        try:
-            valor = float(delay_str[:-2])
-            return -valor if es_negativo else valor
-        except ValueError:
-            return None
-    elif delay_str.endswith('s'):
-        try:
-            segundos = float(delay_str[:-1])
-            valor = segundos * 1000.0
-            return -valor if es_negativo else valor
-        except ValueError:
-            return None
-    else:
-        try:
-            valor = float(delay_str)
-            if valor < 100 and '.' in delay_str:
-                valor = valor * 1000.0
-            return -valor if es_negativo else valor
-        except ValueError:
-            return None
+    signo, numero, unidad = match.groups()
+    valor = float(numero)
+    if unidad == 's' or (unidad is None and valor < 100 and '.' in numero):
+        valor *= 1000.0
+    return -valor if signo == '-' else valor
 
 def parsear_target(target_str):
     """
@@ -870,46 +1417,12 @@ def parsear_target(target_str):
     if not target_str:
         return None
     
-    target_str = target_str.strip().replace(' ', '')
-    
-    if ':' in target_str:
-        partes = target_str.split(':')
-        
-        if len(partes) == 3:
-            horas = float(partes[0])
-            minutos = float(partes[1])
-            
-            seg_parts = partes[2].split('.')
-            segundos = float(seg_parts[0])
-            if len(seg_parts) > 1:
-                segundos += float('0.' + seg_parts[1])
-            
-            total_segundos = horas * 3600 + minutos * 60 + segundos
-            
-        elif len(partes) == 2:
-            minutos = float(partes[0])
-            
-            seg_parts = partes[1].split('.')
-            segundos = float(seg_parts[0])
-            if len(seg_parts) > 1:
-                segundos += float('0.' + seg_parts[1])
-            
-            total_segundos = minutos * 60 + segundos
-            
-        else:
-            return None
-    
-    else:
-        try:
-            total_segundos = float(target_str)
-            
-            if target_str.startswith('.'):
-                pass
-            
-        except ValueError:
-            return None
+    match = _RE_TARGET.fullmatch(target_str.strip().replace(' ', ''))
+    if not match:
+        return None
     
-    return total_segundos
+    horas, minutos, segundos = match.groups()
+    return float(horas or 0) * 3600 + float(minutos or 0) * 60 + float(segundos)
 
 def ajustar_delay_a_frames(delay_ms, frame_duration_ms):
     """
@@ -921,50 +1434,31 @@ def ajustar_delay_a_frames(delay_ms, frame_duration_ms):
     
     frames_exactos = delay_ms / frame_duration_ms
     
-    if delay_ms < 0:
-        frames_abajo = math.floor(frames_exactos)
-        frames_arriba = math.ceil(frames_exactos)
-    else:
-        frames_abajo = math.floor(frames_exactos)
-        frames_arriba = math.ceil(frames_exactos)
+    # Aritmética racional exacta: frame duration = SPF × 1000 / sample rate
+    # (denominador pequeño), así que divmod da el frame inferior (floor,
+    # también para delays negativos) y el resto sin error de redondeo
+    frame = Fraction(frame_duration_ms).limit_denominator(1_000_000)
+    delay = Fraction(delay_ms).limit_denominator(1_000_000)
+    frames_abajo, resto = divmod(delay, frame)
     
-    if abs(frames_exactos - frames_abajo) < 0.000001:
-        delay_ajustado_ms = frames_abajo * frame_duration_ms
-        frames_elegidos = frames_abajo
-        return delay_ajustado_ms, frames_elegidos, frames_exactos
-    
-    delay_abajo_ms = frames_abajo * frame_duration_ms
-    delay_arriba_ms = frames_arriba * frame_duration_ms
-    
-    diff_abajo = abs(delay_ms - delay_abajo_ms)
-    diff_arriba = abs(delay_ms - delay_arriba_ms)
-    
-    if diff_abajo <= diff_arriba:
-        delay_ajustado_ms = delay_abajo_ms
+    # Frame boundary más cercano; en empate exacto, el inferior
+    if resto <= frame - resto:
         frames_elegidos = frames_abajo
     else:
-        delay_ajustado_ms = delay_arriba_ms
-        frames_elegidos = frames_arriba
+        frames_elegidos = frames_abajo + 1
     
-    return delay_ajustado_ms, frames_elegidos, frames_exactos
+    return frames_elegidos * frame_duration_ms, frames_elegidos, frames_exactos
 
 def calcular_duracion_exacta_mka(mka_path, frame_duration_ms):
     """
     Calcula la duración EXACTA (en frames) de un archivo MKA
     Usa pymediainfo para obtener duración real, luego ajusta a frame boundaries
     """
-    metadatos = obtener_metadatos_mediainfo(mka_path)
-    if metadatos['Duration_sample'] == 'N/A':
-        return None, None
-    
     try:
-        match = re.search(r'\((\d+\.?\d*)\s*s\)', metadatos['Duration_sample'])
-        if match:
-            duracion_s = float(match.group(1))
-        else:
-            duracion_s = float(metadatos['Duration_sample'])
+        duracion_ms = duracion_audio_ms(mka_path)
+        if duracion_ms is None:
+            return None, None
         
-        duracion_ms = duracion_s * 1000
         frames_exactos = duracion_ms / frame_duration_ms
         frames_enteros = round(frames_exactos)
         
@@ -975,11 +1469,17 @@ def calcular_duracion_exacta_mka(mka_path, frame_duration_ms):
         print(f"  Error calculando duración exacta: {e}")
         return None, None
 
+# Segmentos parciales ya extraídos en este proceso:
+# (identidad del silencio base, frames del parcial) -> ruta del segmento
+_SEGMENTOS_PARCIALES = {}
+
 def crear_segmentos_delay(silencio_base_path, delay_ms, frame_duration_ms, duracion_silencio_ms, temp_dir, sufijo="_delay"):
     """
     Crea segmentos de silencio para aplicar delay positivo
     NOTA: Siempre calcula duración EXACTA del archivo base, nunca asume valores
     """
+    temp_dir = directorio_silencios(temp_dir)
+    
     if not silencio_base_path.exists():
         print(f"  Error: Archivo base de silencio no encontrado: {silencio_base_path}")
         return None, None
@@ -1034,37 +1534,44 @@ def crear_segmentos_delay(silencio_base_path, delay_ms, frame_duration_ms, durac
     
     print(f"\n  3. Creando archivos de segmentos:")
     
-    for i in range(repeticiones_completas):
-        segmento_num = i + 1
-        nombre_segmento = f"{nombre_base}_silencio{sufijo}_{segmento_num}.mka"
-        path_segmento = temp_dir / nombre_segmento
-        
-        try:
-            shutil.copy2(silencio_base_path, path_segmento)
-            print(f"     {nombre_segmento} (completo, {duracion_silencio_ms_ajustada:.2f} ms)")
-            segmentos_creados.append(path_segmento)
-        except Exception as e:
-            print(f"     Error copiando segmento {segmento_num}: {e}")
-            return None, None
+    # Los segmentos completos son el propio silencio base repetido en la lista
+    # de concat: el demuxer abre cada entrada por separado, así que no hace
+    # falta crear una copia (ni un hardlink) por repetición
+    if repeticiones_completas:
+        segmentos_creados.extend([silencio_base_path] * repeticiones_completas)
+        print(f"     {silencio_base_path.name} × {repeticiones_completas} "
+              f"(completo, {duracion_silencio_ms_ajustada:.2f} ms c/u, sin copias)")
     
     if resto_ms > 0:
         resto_ajustado_ms = calcular_duracion_ajustada(resto_ms, frame_duration_ms, mostrar_ajuste=False)
         
         if resto_ajustado_ms > 0:
-            segmento_num = repeticiones_completas + 1
-            nombre_segmento = f"{nombre_base}_silencio{sufijo}_{segmento_num}.mka"
-            path_segmento = temp_dir / nombre_segmento
-            
-            inicio_s = 0.0
-            fin_s = resto_ajustado_ms / 1000.0
-            
-            archivo_parcial = extraer_segmento_ffmpeg(silencio_base_path, inicio_s, fin_s, path_segmento)
-            
-            if archivo_parcial and archivo_parcial.exists():
-                print(f"     {nombre_segmento} (parcial, {resto_ajustado_ms:.2f} ms)")
-                segmentos_creados.append(archivo_parcial)
+            # Un parcial con los mismos frames del mismo silencio base (ej: delay
+            # y target en la misma ejecución) es idéntico: se reutiliza el archivo
+            st_base = silencio_base_path.stat()
+            clave_parcial = (st_base.st_dev, st_base.st_ino, st_base.st_size, st_base.st_mtime_ns,
+                             round(resto_ajustado_ms / frame_duration_ms))
+            archivo_previo = _SEGMENTOS_PARCIALES.get(clave_parcial)
+            
+            if archivo_previo is not None and archivo_previo.exists():
+                print(f"     {archivo_previo.name} (parcial, {resto_ajustado_ms:.2f} ms, reutilizado)")
+                segmentos_creados.append(archivo_previo)
             else:
-                print(f"     Error: No se pudo crear segmento parcial de {resto_ajustado_ms:.2f} ms")
+                segmento_num = repeticiones_completas + 1
+                nombre_segmento = f"{nombre_base}_silencio{sufijo}_{segmento_num}.mka"
+                path_segmento = temp_dir / nombre_segmento
+                
+                inicio_s = 0.0
+                fin_s = resto_ajustado_ms / 1000.0
+                
+                archivo_parcial = extraer_segmento_ffmpeg(silencio_base_path, inicio_s, fin_s, path_segmento)
+                
+                if archivo_parcial and archivo_parcial.exists():
+                    print(f"     {nombre_segmento} (parcial, {resto_ajustado_ms:.2f} ms)")
+                    segmentos_creados.append(archivo_parcial)
+                    _SEGMENTOS_PARCIALES[clave_parcial] = archivo_parcial
+                else:
+                    print(f"     Error: No se pudo crear segmento parcial de {resto_ajustado_ms:.2f} ms")
     
     if not segmentos_creados:
         print(f"  Error: No se crearon segmentos")
@@ -1072,17 +1579,25 @@ def crear_segmentos_delay(silencio_base_path, delay_ms, frame_duration_ms, durac
     
     print(f"\n  4. Resumen de segmentos creados:")
     total_segundos = 0
+    lineas = []
     for i, segmento in enumerate(segmentos_creados, 1):
-        if segmento.exists():
-            tamaño = segmento.stat().st_size
-            duracion_seg_ms, _ = calcular_duracion_exacta_mka(segmento, frame_duration_ms)
+        st = _stat_o_none(segmento)
+        if st:
+            tamaño = st.st_size
+            # Los segmentos completos son copias exactas del silencio base:
+            # solo el parcial necesita medirse
+            if i <= repeticiones_completas:
+                duracion_seg_ms = duracion_silencio_ms_ajustada
+            else:
+                duracion_seg_ms, _ = calcular_duracion_exacta_mka(segmento, frame_duration_ms)
             if duracion_seg_ms:
                 total_segundos += duracion_seg_ms / 1000
-                print(f"     Segmento {i}: {segmento.name} ({tamaño:,} bytes, {duracion_seg_ms:.2f} ms)")
+                lineas.append(f"     Segmento {i}: {segmento.name} ({tamaño:,} bytes, {duracion_seg_ms:.2f} ms)")
             else:
-                print(f"     Segmento {i}: {segmento.name} ({tamaño:,} bytes)")
+                lineas.append(f"     Segmento {i}: {segmento.name} ({tamaño:,} bytes)")
         else:
-            print(f"     Segmento {i}: {segmento.name} (ERROR: no existe)")
+            lineas.append(f"     Segmento {i}: {segmento.name} (ERROR: no existe)")
+    print("\n".join(lineas))
     
     suma_total_ms = total_segundos * 1000 if total_segundos > 0 else delay_ajustado_ms
     diferencia_ms = suma_total_ms - delay_ajustado_ms
@@ -1096,23 +1611,18 @@ def crear_segmentos_delay(silencio_base_path, delay_ms, frame_duration_ms, durac
     
     return segmentos_creados, delay_ajustado_ms
 
-def crear_audio_con_delay(mka_path, inicio_corte_s, temp_dir, nombre_sufijo="_delay"):
+def crear_audio_con_delay(mka_path, inicio_corte_s, temp_dir, nombre_sufijo="_delay", duracion_max_s=None):
     """
     Crea un archivo de audio con delay aplicado (para delay negativo)
+    duracion_max_s: si se indica, también corta el final (-t) en la misma pasada
     NOTA: ffmpeg con -y sobrescribe automáticamente si el archivo existe
     """
     if not mka_path.exists():
         print(f"  Error: Archivo MKA no encontrado: {mka_path}")
         return None
     
-    nombre_base = mka_path.stem
-    if nombre_base.endswith("_temp") or nombre_base.endswith("_analisis"):
-        nombre_base = nombre_base[:-5]
-    
     # Limpiar múltiples sufijos
-    for sufijo in ["_temp", "_analisis", "_delay", "_target"]:
-        if nombre_base.endswith(sufijo):
-            nombre_base = nombre_base[:-len(sufijo)]
+    nombre_base = _RE_SUFIJOS_PROCESO.sub('', mka_path.stem)
     
     # Asegurar que no haya sufijo duplicado
     if not nombre_base.endswith(nombre_sufijo):
@@ -1125,17 +1635,12 @@ def crear_audio_con_delay(mka_path, inicio_corte_s, temp_dir, nombre_sufijo="_de
     print(f"  Creando audio con delay aplicado desde {inicio_corte_s:.3f}s...")
     
     try:
-        media_info = MediaInfo.parse(str(mka_path))
-        duracion_total_s = None
-        for track in media_info.tracks:
-            if track.track_type == 'Audio' and hasattr(track, 'duration'):
-                duracion_total_ms = float(str(track.duration).replace(' ', ''))
-                duracion_total_s = duracion_total_ms / 1000.0
-                break
+        duracion_total_ms = duracion_audio_ms(mka_path)
         
-        if duracion_total_s is None:
+        if duracion_total_ms is None:
             print(f"  Error: No se pudo obtener duración del audio")
             return None
+        duracion_total_s = duracion_total_ms / 1000.0
     except Exception as e:
         print(f"  Error obteniendo duración con pymediainfo: {e}")
         return None
@@ -1144,29 +1649,37 @@ def crear_audio_con_delay(mka_path, inicio_corte_s, temp_dir, nombre_sufijo="_de
         print(f"  Error: El corte ({inicio_corte_s:.3f}s) excede la duración total ({duracion_total_s:.3f}s)")
         return None
     
-    inicio_formato = segundos_a_formato_ffmpeg(inicio_corte_s)
-    
-    cmd = [
-        "ffmpeg",
-        "-i", str(mka_path),
-        "-ss", inicio_formato,
-        "-c", "copy",
-        "-map", "0",
-        "-y",
-        "-loglevel", "error",
-        str(path_delay)
-    ]
-    
-    print(f"  Comando ffmpeg: -ss {inicio_corte_s:.3f}s -c copy")
-    print(f"  Corte: desde {inicio_corte_s:.3f}s hasta el final ({duracion_total_s:.3f}s)")
+    duracion_delay_s = duracion_total_s - inicio_corte_s
+    if duracion_max_s is not None:
+        duracion_delay_s = min(duracion_delay_s, duracion_max_s)
+    
+    # -ss antes de -i: el demuxer salta con el índice del contenedor en lugar
+    # de leer y descartar todo lo previo; el stream copy descarta igualmente
+    # los paquetes anteriores al punto de corte
+    cmd = (
+        "ffmpeg",
+        "-ss", f"{inicio_corte_s:.6f}",
+        "-i", str(mka_path),
+        "-avoid_negative_ts", "make_zero",
+    )
+    if duracion_max_s is not None:
+        cmd += ("-t", f"{duracion_max_s:.6f}")
+    cmd += _FFMPEG_COPIA + (str(path_delay),)
+    
+    if duracion_max_s is not None:
+        print(f"  Comando ffmpeg: -ss {inicio_corte_s:.3f}s -t {duracion_max_s:.3f}s -c copy")
+        print(f"  Corte: desde {inicio_corte_s:.3f}s hasta {inicio_corte_s + duracion_delay_s:.3f}s (de {duracion_total_s:.3f}s)")
+    else:
+        print(f"  Comando ffmpeg: -ss {inicio_corte_s:.3f}s -c copy")
+        print(f"  Corte: desde {inicio_corte_s:.3f}s hasta el final ({duracion_total_s:.3f}s)")
     
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        result = _ejecutar_ffmpeg(cmd)
         
         if result.returncode == 0:
-            if path_delay.exists() and path_delay.stat().st_size > 0:
-                tamaño = path_delay.stat().st_size
-                duracion_delay_s = duracion_total_s - inicio_corte_s
+            st = _stat_o_none(path_delay)
+            if st and st.st_size > 0:
+                tamaño = st.st_size
                 print(f"  Audio con delay creado: {path_delay.name}")
                 print(f"    Tamaño: {tamaño:,} bytes")
                 print(f"    Duración: {duracion_delay_s:.3f}s")
@@ -1177,7 +1690,7 @@ def crear_audio_con_delay(mka_path, inicio_corte_s, temp_dir, nombre_sufijo="_de
         else:
             print(f"  Error ffmpeg (código {result.returncode}):")
             if result.stderr:
-                print(f"    {result.stderr[:200]}")
+                print(f"    {result.stderr[-200:]}")
             return None
             
     except Exception as e:
@@ -1189,22 +1702,20 @@ def calcular_duracion_audio_segundos(mka_path):
     Calcula la duración del audio en segundos usando pymediainfo
     """
     try:
-        media_info = MediaInfo.parse(str(mka_path))
-        for track in media_info.tracks:
-            if track.track_type == 'Audio' and hasattr(track, 'duration'):
-                duracion_ms = float(str(track.duration).replace(' ', ''))
-                return duracion_ms / 1000.0
-        return None
+        duracion_ms = duracion_audio_ms(mka_path)
+        return duracion_ms / 1000.0 if duracion_ms is not None else None
     except Exception as e:
         print(f"  Error calculando duración con pymediainfo: {e}")
         return None
 
-def concatenar_con_ffmpeg(archivos_a_concatenar, output_path, temp_dir):
+def concatenar_con_ffmpeg(archivos_a_concatenar, output_path, temp_dir, duracion_max_s=None):
     """
     PASO 6: Concatenar archivos MKA usando ffmpeg concat
     Herramienta: ffmpeg concat
     Propósito: Unir segmentos de silencio + audio original (delay positivo)
     Característica: concat_list.txt se conserva en directorio temporal
+    duracion_max_s: si se indica, la salida se corta a esa duración (-t)
+    en la misma pasada, sin archivo intermedio
     """
     if not archivos_a_concatenar:
         print(f"  Error: No hay archivos para concatenar")
@@ -1213,36 +1724,49 @@ def concatenar_con_ffmpeg(archivos_a_concatenar, output_path, temp_dir):
     print(f"\n  Concatenando {len(archivos_a_concatenar)} archivos...")
     print(f"  Archivo final: {output_path.name}")
     
+    # Un archivo puede repetirse en la lista (silencio base): se verifica,
+    # resuelve y formatea como línea de concat una sola vez por ruta distinta
+    lineas_concat = {}
+    lineas = []
     for i, archivo in enumerate(archivos_a_concatenar, 1):
-        if not archivo.exists():
-            print(f"  Error: Archivo {i} no existe: {archivo}")
-            return None
-        print(f"    {i}. {archivo.name}")
+        if archivo not in lineas_concat:
+            if not archivo.exists():
+                lineas.append(f"  Error: Archivo {i} no existe: {archivo}")
+                print("\n".join(lineas))
+                return None
+            lineas_concat[archivo] = f"file '{archivo.resolve()}'\n"
+        lineas.append(f"    {i}. {archivo.name}")
+    print("\n".join(lineas))
     
+    # Lista completa armada en memoria (las repeticiones reutilizan la misma
+    # línea), codificada una vez y escrita con una sola llamada
     lista_file = temp_dir / "concat_list.txt"
-    with open(lista_file, 'w', encoding='utf-8') as f:
-        for archivo in archivos_a_concatenar:
-            f.write(f"file '{archivo.resolve()}'\n")
+    lista_file.write_bytes(
+        "".join(map(lineas_concat.__getitem__, archivos_a_concatenar)).encode('utf-8')
+    )
     
-    cmd = [
+    cmd = (
         "ffmpeg",
         "-f", "concat",
         "-safe", "0",
         "-i", str(lista_file),
-        "-c", "copy",
-        "-y",
-        "-loglevel", "error",
-        str(output_path)
-    ]
+    )
+    if duracion_max_s is not None:
+        cmd += ("-t", f"{duracion_max_s:.6f}")
+    cmd += _FFMPEG_COPIA + (str(output_path),)
     
-    print(f"  Comando ffmpeg: -f concat -i [lista] -c copy")
+    if duracion_max_s is not None:
+        print(f"  Comando ffmpeg: -f concat -i [lista] -t {duracion_max_s:.3f}s -c copy")
+    else:
+        print(f"  Comando ffmpeg: -f concat -i [lista] -c copy")
     
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        result = _ejecutar_ffmpeg(cmd)
         
         if result.returncode == 0:
-            if output_path.exists() and output_path.stat().st_size > 0:
-                tamaño = output_path.stat().st_size
+            st = _stat_o_none(output_path)
+            if st and st.st_size > 0:
+                tamaño = st.st_size
                 print(f"  Archivo concatenado creado exitosamente")
                 print(f"    Tamaño: {tamaño:,} bytes")
                 
@@ -1257,107 +1781,12 @@ def concatenar_con_ffmpeg(archivos_a_concatenar, output_path, temp_dir):
             else:
                 print(f"  Error: Archivo no se creó o está vacío")
                 if result.stderr:
-                    print(f"    Error: {result.stderr[:200]}")
-                return None
-        else:
-            print(f"  Error ffmpeg (código {result.returncode}):")
-            if result.stderr:
-                print(f"    {result.stderr[:200]}")
-            return None
-            
-    except Exception as e:
-        print(f"  Error ejecutando ffmpeg: {e}")
-        return None
-
-def cortar_final_audio(mka_path, duracion_corte_ms, frame_duration_ms, temp_dir, nombre_sufijo="_cortado"):
-    """
-    Corta el FINAL de un archivo de audio para alcanzar target
-    NOTA: ffmpeg con -y sobrescribe automáticamente si el archivo existe
-    """
-    if not mka_path.exists():
-        print(f"  Error: Archivo MKA no encontrado: {mka_path}")
-        return None
-    
-    nombre_base = mka_path.stem
-    for sufijo in ["_temp", "_analisis", "_delay", "_target"]:
-        if nombre_base.endswith(sufijo):
-            nombre_base = nombre_base[:-len(sufijo)]
-    
-    # Asegurar que no haya sufijo duplicado
-    if not nombre_base.endswith(nombre_sufijo):
-        nombre_cortado = f"{nombre_base}{nombre_sufijo}.mka"
-    else:
-        nombre_cortado = f"{nombre_base}.mka"
-    
-    path_cortado = temp_dir / nombre_cortado
-    
-    print(f"  Cortando final del audio por {duracion_corte_ms:.2f} ms...")
-    
-    try:
-        media_info = MediaInfo.parse(str(mka_path))
-        duracion_total_s = None
-        for track in media_info.tracks:
-            if track.track_type == 'Audio' and hasattr(track, 'duration'):
-                duracion_total_ms = float(str(track.duration).replace(' ', ''))
-                duracion_total_s = duracion_total_ms / 1000.0
-                break
-        
-        if duracion_total_s is None:
-            print(f"  Error: No se pudo obtener duración del audio")
-            return None
-    except Exception as e:
-        print(f"  Error obteniendo duración con pymediainfo: {e}")
-        return None
-    
-    # Ajustar corte a frame boundaries
-    duracion_corte_s = duracion_corte_ms / 1000.0
-    duracion_corte_ajustada_ms = calcular_duracion_ajustada(duracion_corte_ms, frame_duration_ms, mostrar_ajuste=False)
-    duracion_corte_ajustada_s = duracion_corte_ajustada_ms / 1000.0
-    
-    if duracion_corte_ajustada_s >= duracion_total_s:
-        print(f"  Error: El corte ({duracion_corte_ajustada_s:.3f}s) excede la duración total ({duracion_total_s:.3f}s)")
-        return None
-    
-    duracion_final_s = duracion_total_s - duracion_corte_ajustada_s
-    
-    print(f"  Ajuste corte a frame boundaries:")
-    print(f"    Corte solicitado: {duracion_corte_ms:.2f} ms ({duracion_corte_ms/frame_duration_ms:.3f} frames)")
-    print(f"    Corte ajustado: {duracion_corte_ajustada_ms:.2f} ms")
-    print(f"    Duración original: {duracion_total_s:.3f}s")
-    print(f"    Duración final deseada: {duracion_final_s:.3f}s")
-    
-    # Usar ffmpeg para cortar el final (usando -t en lugar de -to)
-    cmd = [
-        "ffmpeg",
-        "-i", str(mka_path),
-        "-t", f"{duracion_final_s:.6f}",
-        "-c", "copy",
-        "-map", "0",
-        "-y",
-        "-loglevel", "error",
-        str(path_cortado)
-    ]
-    
-    print(f"  Comando ffmpeg: -t {duracion_final_s:.3f}s -c copy")
-    print(f"  Corte: mantener primeros {duracion_final_s:.3f}s de {duracion_total_s:.3f}s")
-    
-    try:
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        
-        if result.returncode == 0:
-            if path_cortado.exists() and path_cortado.stat().st_size > 0:
-                tamaño = path_cortado.stat().st_size
-                print(f"  Audio cortado creado: {path_cortado.name}")
-                print(f"    Tamaño: {tamaño:,} bytes")
-                print(f"    Duración: {duracion_final_s:.3f}s")
-                return path_cortado
-            else:
-                print(f"  Error: Archivo no se creó o está vacío")
+                    print(f"    Error: {result.stderr[-200:]}")
                 return None
         else:
             print(f"  Error ffmpeg (código {result.returncode}):")
             if result.stderr:
-                print(f"    {result.stderr[:200]}")
+                print(f"    {result.stderr[-200:]}")
             return None
             
     except Exception as e:
@@ -1397,7 +1826,8 @@ def procesar_delay_con_target(input_file, delay_str, target_str, temp_dir):
     else:
         print(f"Tipo: {'NEGATIVO (cortar inicio)' if es_negativo else 'POSITIVO (agregar silencio)'} con ajuste para target")
     
-    nombre_base = Path(input_file).stem
+    input_path = Path(input_file)
+    nombre_base = input_path.stem
     mka_name = nombre_base + ".mka"
     mka_path = temp_dir / mka_name
     
@@ -1408,7 +1838,7 @@ def procesar_delay_con_target(input_file, delay_str, target_str, temp_dir):
     
     print(f"\nPaso 2/5: Extrayendo metadatos confiables con pymediainfo...")
     
-    metadatos = obtener_metadatos_mediainfo(mka_path)
+    metadatos = obtener_metadatos_mediainfo(mka_path, input_file)
     
     if metadatos['Frame_duration_ms'] is None:
         print(f"\n{'='*60}")
@@ -1422,7 +1852,12 @@ def procesar_delay_con_target(input_file, delay_str, target_str, temp_dir):
     frame_duration_ms = metadatos['Frame_duration_ms']
     print(f"  Frame duration: {frame_duration_ms:.4f} ms")
     
-    duracion_audio_s = calcular_duracion_audio_segundos(mka_path)
+    # La duración viene con los metadatos (incluso desde la caché en disco);
+    # solo las entradas antiguas sin Duration_ms requieren otro parse
+    if metadatos.get('Duration_ms') is not None:
+        duracion_audio_s = metadatos['Duration_ms'] / 1000.0
+    else:
+        duracion_audio_s = calcular_duracion_audio_segundos(mka_path)
     if duracion_audio_s is None:
         print(f"ERROR: No se pudo obtener duración del audio")
         return "error", None
@@ -1452,30 +1887,31 @@ def procesar_delay_con_target(input_file, delay_str, target_str, temp_dir):
             resultado_target = "negativo"
         
         if resultado_target == "positivo":
-            print(f"\nPaso 4/5: Creando archivo base de silencio...")
-            
-            wav_path = convertir_mka_a_wav(mka_path, temp_dir)
-            if not wav_path:
-                print(f"Error: No se pudo crear archivo WAV para análisis")
-                return "error", None
-            
-            resultado_silencios = analizar_silencios_wav(wav_path, frame_duration_ms)
-            
-            if not resultado_silencios:
-                print(f"Error: No se encontraron silencios adecuados")
-                return "error", None
+            archivo_final_path = temp_dir / f"{nombre_base}_target.mka"
             
-            mostrar_resultado_silencios(resultado_silencios, Path(input_file).name)
+            # PCM: el relleno se hace en una sola pasada, sin silencio base ni concat
+            archivo_final, _ = rellenar_pcm_al_final(
+                mka_path, ajuste_target_ms, frame_duration_ms, archivo_final_path
+            )
+            if archivo_final:
+                duracion_final_s = calcular_duracion_audio_segundos(archivo_final)
+                if duracion_final_s:
+                    diferencia_final_s = target_s - duracion_final_s
+                    print(f"\n  Verificación final:")
+                    print(f"    Target solicitado: {target_s:.6f} s")
+                    print(f"    Duración final: {duracion_final_s:.6f} s")
+                    print(f"    Diferencia: {diferencia_final_s:.6f} s ({diferencia_final_s*1000:.3f} ms)")
+                
+                return "solo_target", archivo_final
             
-            archivo_silencio = extraer_silencio_del_mka(mka_path, resultado_silencios, temp_dir)
+            print(f"\nPaso 4/5: Creando archivo base de silencio...")
             
-            if not archivo_silencio or not archivo_silencio.exists():
-                print(f"Error: No se pudo extraer el segmento de silencio")
+            silencio_base_path, duracion_silencio_ms = crear_silencio_base(
+                mka_path, frame_duration_ms, temp_dir, input_path.name, input_file
+            )
+            if not silencio_base_path:
                 return "error", None
             
-            silencio_base_path = archivo_silencio
-            duracion_silencio_ms = resultado_silencios['duracion_ajustada_ms']
-            
             print(f"  Duración silencio base: {duracion_silencio_ms:.2f} ms")
             
             print(f"\nPaso 5/5: Creando segmentos para target ({ajuste_target_ms:.2f} ms)...")
@@ -1497,8 +1933,6 @@ def procesar_delay_con_target(input_file, delay_str, target_str, temp_dir):
             
             archivos_concatenar = [mka_path] + segmentos_target
             
-            archivo_final_path = temp_dir / f"{nombre_base}_target.mka"
-            
             archivo_final = concatenar_con_ffmpeg(archivos_concatenar, archivo_final_path, temp_dir)
             
             if not archivo_final:
@@ -1628,27 +2062,26 @@ def procesar_delay_con_target(input_file, delay_str, target_str, temp_dir):
                 
                 inicio_corte_s = delay_corte_ajustado_ms / 1000.0
                 
-                # Crear archivo con delay aplicado
-                archivo_con_delay = crear_audio_con_delay(mka_path, inicio_corte_s, temp_dir, "_temp_delay")
-                
-                if not archivo_con_delay:
-                    print(f"Error: No se pudo aplicar delay negativo")
-                    return "error", None
+                # Corte del final ajustado a frame boundaries; inicio y final se
+                # cortan en una sola pasada de ffmpeg, sin archivo intermedio
+                corte_final_ajustado_ms = calcular_duracion_ajustada(abs(ajuste_target_ms), frame_duration_ms, mostrar_ajuste=False)
+                duracion_con_delay_s = duracion_audio_s - inicio_corte_s
+                duracion_corte_final_s = duracion_con_delay_s - (corte_final_ajustado_ms / 1000.0)
                 
-                # Ahora ajustar target cortando el final
                 print(f"\n  Ajustando target cortando el final:")
                 print(f"    Corte necesario: {abs(ajuste_target_ms):.2f} ms")
+                print(f"    Corte ajustado: {corte_final_ajustado_ms:.2f} ms")
                 
-                archivo_final = cortar_final_audio(
-                    archivo_con_delay,
-                    abs(ajuste_target_ms),
-                    frame_duration_ms,
-                    temp_dir,
-                    nombre_sufijo="_delay_target"
-                )
+                if duracion_corte_final_s <= 0:
+                    print(f"Error: El corte ({corte_final_ajustado_ms/1000:.3f}s) excede la duración con delay ({duracion_con_delay_s:.3f}s)")
+                    return "error", None
+                
+                print(f"    Duración final deseada: {duracion_corte_final_s:.3f}s")
                 
-                # Limpiar archivo temporal
-                archivo_con_delay.unlink(missing_ok=True)
+                archivo_final = crear_audio_con_delay(
+                    mka_path, inicio_corte_s, temp_dir, "_delay_target",
+                    duracion_max_s=duracion_corte_final_s
+                )
                 
             else:
                 # Delay negativo pero target positivo: Cortar inicio pero luego agregar silencio al final
@@ -1656,64 +2089,59 @@ def procesar_delay_con_target(input_file, delay_str, target_str, temp_dir):
                 print(f"    1. Delay: cortar {abs(delay_ajustado_ms):.2f} ms del inicio")
                 print(f"    2. Target: agregar {ajuste_target_ms:.2f} ms al final")
                 
-                # Primero aplicar delay negativo
-                delay_corte_ms = abs(delay_ajustado_ms)
-                delay_corte_ajustado_ms, delay_frames, _ = ajustar_delay_a_frames(
-                    -delay_corte_ms, frame_duration_ms
-                )
-                delay_corte_ajustado_ms = abs(delay_corte_ajustado_ms)
-                
-                inicio_corte_s = delay_corte_ajustado_ms / 1000.0
-                
-                archivo_con_delay = crear_audio_con_delay(mka_path, inicio_corte_s, temp_dir, "_temp_delay")
-                
-                if not archivo_con_delay:
-                    print(f"Error: No se pudo aplicar delay negativo")
-                    return "error", None
-                
-                # Ahora necesitamos crear segmentos de silencio para agregar al final
-                print(f"\n  Creando archivo base de silencio para target positivo...")
-                
-                wav_path = convertir_mka_a_wav(archivo_con_delay, temp_dir)
-                if not wav_path:
-                    print(f"Error: No se pudo crear WAV para análisis de silencio")
-                    return "error", None
-                
-                resultado_silencios = analizar_silencios_wav(wav_path, frame_duration_ms)
-                
-                if not resultado_silencios:
-                    print(f"Error: No se encontraron silencios para target")
-                    return "error", None
-                
-                archivo_silencio = extraer_silencio_del_mka(archivo_con_delay, resultado_silencios, temp_dir)
-                
-                if not archivo_silencio:
-                    print(f"Error: No se pudo extraer silencio")
-                    return "error", None
-                
-                # Crear segmentos para target
-                duracion_silencio_ms = resultado_silencios['duracion_ajustada_ms']
-                segmentos_target, target_real_ms = crear_segmentos_delay(
-                    archivo_silencio,
-                    ajuste_target_ms,
-                    frame_duration_ms,
-                    duracion_silencio_ms,
-                    temp_dir,
-                    sufijo="_target"
+                # PCM: corte del inicio y relleno final en una sola pasada
+                archivo_final, _, _ = aplicar_delay_pcm(
+                    mka_path, delay_ajustado_ms, ajuste_target_ms, frame_duration_ms,
+                    temp_dir / f"{nombre_base}_delay_target.mka"
                 )
                 
-                if not segmentos_target:
-                    print(f"Error: No se pudieron crear segmentos para target")
-                    return "error", None
-                
-                # Concatenar archivo con delay + segmentos de target
-                archivos_concatenar = [archivo_con_delay] + segmentos_target
-                archivo_final_path = temp_dir / f"{nombre_base}_delay_target.mka"
-                
-                archivo_final = concatenar_con_ffmpeg(archivos_concatenar, archivo_final_path, temp_dir)
-                
-                # Limpiar archivos temporales
-                archivo_con_delay.unlink(missing_ok=True)
+                if not archivo_final:
+                    # Primero aplicar delay negativo
+                    delay_corte_ms = abs(delay_ajustado_ms)
+                    delay_corte_ajustado_ms, delay_frames, _ = ajustar_delay_a_frames(
+                        -delay_corte_ms, frame_duration_ms
+                    )
+                    delay_corte_ajustado_ms = abs(delay_corte_ajustado_ms)
+                    
+                    inicio_corte_s = delay_corte_ajustado_ms / 1000.0
+                    
+                    archivo_con_delay = crear_audio_con_delay(mka_path, inicio_corte_s, temp_dir, "_temp_delay")
+                    
+                    if not archivo_con_delay:
+                        print(f"Error: No se pudo aplicar delay negativo")
+                        return "error", None
+                    
+                    # Ahora necesitamos crear segmentos de silencio para agregar al final
+                    print(f"\n  Creando archivo base de silencio para target positivo...")
+                    
+                    archivo_silencio, duracion_silencio_ms = crear_silencio_base(
+                        archivo_con_delay, frame_duration_ms, temp_dir
+                    )
+                    if not archivo_silencio:
+                        return "error", None
+                    
+                    # Crear segmentos para target
+                    segmentos_target, target_real_ms = crear_segmentos_delay(
+                        archivo_silencio,
+                        ajuste_target_ms,
+                        frame_duration_ms,
+                        duracion_silencio_ms,
+                        temp_dir,
+                        sufijo="_target"
+                    )
+                    
+                    if not segmentos_target:
+                        print(f"Error: No se pudieron crear segmentos para target")
+                        return "error", None
+                    
+                    # Concatenar archivo con delay + segmentos de target
+                    archivos_concatenar = [archivo_con_delay] + segmentos_target
+                    archivo_final_path = temp_dir / f"{nombre_base}_delay_target.mka"
+                    
+                    archivo_final = concatenar_con_ffmpeg(archivos_concatenar, archivo_final_path, temp_dir)
+                    
+                    # Limpiar archivos temporales
+                    archivo_con_delay.unlink(missing_ok=True)
             
             if not archivo_final or not archivo_final.exists():
                 print(f"Error: No se pudo crear el audio final")
@@ -1733,30 +2161,38 @@ def procesar_delay_con_target(input_file, delay_str, target_str, temp_dir):
             # CASO: DELAY POSITIVO con target
             print(f"\nPaso 4/5: Procesando delay POSITIVO con ajuste para target...")
             
-            print(f"  Creando archivo base de silencio...")
-            
-            wav_path = convertir_mka_a_wav(mka_path, temp_dir)
-            if not wav_path:
-                print(f"Error: No se pudo crear archivo WAV para análisis")
-                return "error", None
-            
-            resultado_silencios = analizar_silencios_wav(wav_path, frame_duration_ms)
-            
-            if not resultado_silencios:
-                print(f"Error: No se encontraron silencios adecuados")
-                return "error", None
-            
-            mostrar_resultado_silencios(resultado_silencios, Path(input_file).name)
+            # PCM: delay y ajuste para target (relleno o corte final) en una sola
+            # pasada, sin silencio base ni concat
+            relleno_target_ms = ajuste_target_ms if resultado_target == "positivo" else 0
+            duracion_max_s = None
+            if resultado_target == "negativo":
+                corte_ajustado_ms = calcular_duracion_ajustada(abs(ajuste_target_ms), frame_duration_ms, mostrar_ajuste=False)
+                duracion_max_s = duracion_audio_s + (delay_ajustado_ms - corte_ajustado_ms) / 1000.0
+            sufijo_final = "_delay" if resultado_target == "exacto" else "_delay_target"
+            archivo_final, delay_real_ms, ajuste_real_ms = aplicar_delay_pcm(
+                mka_path, delay_ajustado_ms, relleno_target_ms, frame_duration_ms,
+                temp_dir / f"{nombre_base}{sufijo_final}.mka", duracion_max_s=duracion_max_s
+            )
+            if archivo_final:
+                duracion_final_s = calcular_duracion_audio_segundos(archivo_final)
+                if duracion_final_s:
+                    diferencia_final_s = target_s - duracion_final_s
+                    print(f"\n  Verificación:")
+                    print(f"    Silencio total: {(delay_real_ms + ajuste_real_ms):.2f} ms")
+                    print(f"    Duración final: {duracion_final_s:.6f} s")
+                    print(f"    Target deseado: {target_s:.6f} s")
+                    print(f"    Diferencia: {diferencia_final_s:.6f} s ({diferencia_final_s*1000:.3f} ms)")
+                
+                return "positivo_con_target", archivo_final
             
-            archivo_silencio = extraer_silencio_del_mka(mka_path, resultado_silencios, temp_dir)
+            print(f"  Creando archivo base de silencio...")
             
-            if not archivo_silencio or not archivo_silencio.exists():
-                print(f"Error: No se pudo extraer el segmento de silencio")
+            silencio_base_path, duracion_silencio_ms = crear_silencio_base(
+                mka_path, frame_duration_ms, temp_dir, input_path.name, input_file
+            )
+            if not silencio_base_path:
                 return "error", None
             
-            silencio_base_path = archivo_silencio
-            duracion_silencio_ms = resultado_silencios['duracion_ajustada_ms']
-            
             print(f"  Duración silencio base: {duracion_silencio_ms:.2f} ms")
             
             print(f"\n  Creando segmentos para delay de {delay_ajustado_ms:.2f} ms...")
@@ -1783,34 +2219,36 @@ def procesar_delay_con_target(input_file, delay_str, target_str, temp_dir):
                 # TARGET < (Audio + Delay): Necesitamos CORTAR el final
                 print(f"\n  Target < (Audio + Delay): Cortando {abs(ajuste_target_ms):.2f} ms del final...")
                 
-                # Primero crear archivo con delay aplicado
-                archivos_concatenar = segmentos_delay + [mka_path]
-                archivo_con_delay_path = temp_dir / f"{nombre_base}_con_delay_temp.mka"
-                
-                archivo_con_delay = concatenar_con_ffmpeg(archivos_concatenar, archivo_con_delay_path, temp_dir)
+                # Corte ajustado a frame boundaries; la concatenación y el corte
+                # se hacen en una sola pasada de ffmpeg (-t), sin archivo intermedio
+                corte_ajustado_ms = calcular_duracion_ajustada(abs(ajuste_target_ms), frame_duration_ms, mostrar_ajuste=False)
+                duracion_con_delay_s = duracion_audio_s + (delay_real_ms / 1000.0)
+                duracion_corte_final_s = duracion_con_delay_s - (corte_ajustado_ms / 1000.0)
                 
-                if not archivo_con_delay:
-                    print(f"Error: No se pudo crear archivo con delay para luego cortar")
+                if duracion_corte_final_s <= 0:
+                    print(f"Error: El corte ({corte_ajustado_ms/1000:.3f}s) excede la duración con delay ({duracion_con_delay_s:.3f}s)")
                     return "error", None
                 
-                # Ahora cortar el final para alcanzar el target
-                print(f"\n  Cortando final del archivo para alcanzar target...")
+                print(f"  Ajuste corte a frame boundaries:")
+                print(f"    Corte solicitado: {abs(ajuste_target_ms):.2f} ms ({abs(ajuste_target_ms)/frame_duration_ms:.3f} frames)")
+                print(f"    Corte ajustado: {corte_ajustado_ms:.2f} ms")
+                print(f"    Duración con delay: {duracion_con_delay_s:.3f}s")
+                print(f"    Duración final deseada: {duracion_corte_final_s:.3f}s")
                 
-                archivo_final = cortar_final_audio(
-                    archivo_con_delay,
-                    abs(ajuste_target_ms),
-                    frame_duration_ms,
-                    temp_dir,
-                    nombre_sufijo="_delay_target"
+                print(f"\nPaso 5/5: Concatenando y cortando en una sola pasada (ffmpeg)...")
+                
+                archivos_concatenar = segmentos_delay + [mka_path]
+                archivo_final_path = temp_dir / f"{nombre_base}_delay_target.mka"
+                
+                archivo_final = concatenar_con_ffmpeg(
+                    archivos_concatenar, archivo_final_path, temp_dir,
+                    duracion_max_s=duracion_corte_final_s
                 )
                 
                 if not archivo_final:
-                    print(f"Error: No se pudo cortar el final del archivo")
+                    print(f"Error: No se pudo concatenar y cortar el archivo")
                     return "error", None
                 
-                # Limpiar archivo temporal
-                archivo_con_delay_path.unlink(missing_ok=True)
-                
             elif resultado_target == "positivo":
                 # TARGET > (Audio + Delay): Necesitamos agregar MÁS silencio
                 print(f"\n  Creando segmentos adicionales para target ({ajuste_target_ms:.2f} ms)...")
@@ -1893,87 +2331,278 @@ def procesar_delay_con_target(input_file, delay_str, target_str, temp_dir):
             
             return "positivo_con_target", archivo_final
 
+def ffmpeg_disponible(temp_dir):
+    """
+    Verifica que ffmpeg funcione (ffmpeg -version) una sola vez por binario:
+    el resultado queda marcado en temp_dir con una clave de ruta + mtime,
+    así que reemplazar o actualizar ffmpeg fuerza una nueva verificación
+    """
+    import hashlib
+    
+    ffmpeg_path = shutil.which("ffmpeg")
+    if ffmpeg_path is None:
+        return False
+    
+    try:
+        mtime_ns = os.stat(ffmpeg_path).st_mtime_ns
+    except OSError:
+        return False
+    
+    clave = hashlib.sha1(f"{ffmpeg_path}\0{mtime_ns}".encode('utf-8')).hexdigest()[:16]
+    marca = temp_dir / f".ffmpeg_ok_{clave}"
+    if marca.exists():
+        return True
+    
+    try:
+        subprocess.run([ffmpeg_path, "-version"], stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return False
+    
+    try:
+        marca.touch()
+    except OSError:
+        pass
+    return True
+
+# Texto de uso (sin argumentos), armado una vez al importar
+_AYUDA = "\n".join((
+    "Delay Fix v1.0.1 - Herramienta para análisis de audio y aplicación de delay",
+    "=" * 70,
+    "DESCRIPCIÓN:",
+    "  Analiza silencios en audio y aplica delays precisos ajustados a frame boundaries",
+    "  Permite target de duración exacta con alineación perfecta a frames",
+    "\nMODO 1: Análisis de silencio (extrae segmento para delays positivos)",
+    "  Uso: python delay_fix.py <archivo_de_audio>",
+    "\nMODO 2: Aplicar delay (positivo o negativo)",
+    "  Uso: python delay_fix.py <archivo_de_audio> <delay>",
+    "\nMODO 3: Aplicar delay con target exacto",
+    "  Uso: python delay_fix.py <archivo_de_audio> <delay> <target>",
+    "  NOTA: Si delay=0, solo se aplica ajuste para target",
+    "\nMODO LOTE: Varios archivos con los mismos parámetros (en paralelo)",
+    "  Uso: python delay_fix.py <archivo1> <archivo2> ... [delay] [target]",
+    "  Opción: --parallel N (o -j N) limita los procesos en paralelo",
+    "\nFORMATOS DE DELAY (positivo o negativo):",
+    "  2000       (2000 milisegundos)",
+    "  2000ms     (2000 milisegundos)",
+    "  2.0s       (2.0 segundos)",
+    "  -2000      (-2000 milisegundos - corta inicio)",
+    "  -2000ms    (-2000 milisegundos - corta inicio)",
+    "  -2.0s      (-2.0 segundos - corta inicio)",
+    "\nFORMATOS DE TARGET (duración total deseada):",
+    "  01:35:50     (1 hora, 35 minutos, 50 segundos)",
+    "  1:35:50.500  (1 hora, 35 minutos, 50 segundos y 500ms)",
+    "  35:50.500    (35 minutos, 50 segundos y 500ms)",
+    "  50.500       (50 segundos y 500ms)",
+    "  .500         (500 milisegundos)",
+    "  1.5          (1.5 segundos = 1500ms)",
+    "\n  Delay y target aceptan un '+' inicial. No se aceptan exponentes (1e3),",
+    "  inf/nan, '_' entre dígitos, signos dobles ni targets negativos",
+    "\nEJEMPLOS PRÁCTICOS:",
+    "  Analizar silencio:",
+    "    python delay_fix.py audio.aac",
+    "\n  Aplicar delay positivo (agrega 2 segundos de silencio):",
+    "    python delay_fix.py audio.aac 2000",
+    "\n  Aplicar delay negativo (corta 2 segundos del inicio):",
+    "    python delay_fix.py audio.aac -2000",
+    "\n  Ajustar duración total a 1:35:50 (con delay positivo):",
+    "    python delay_fix.py audio.aac 2000 01:35:50",
+    "\n  Solo ajustar duración total a 1:35:50 (delay=0):",
+    "    python delay_fix.py audio.aac 0 01:35:50",
+    "\n  Aplicar el mismo delay a varios archivos:",
+    "    python delay_fix.py ep01.aac ep02.aac ep03.aac 2000",
+    "\nNOTAS IMPORTANTES:",
+    "  • Archivo final se guarda en el mismo directorio del archivo de entrada",
+    "  • Archivos temporales se guardan en directorio temporal del sistema",
+    "  • concat_list.txt se conserva en temporales para debugging",
+    "  • Requiere: ffmpeg en PATH y pymediainfo instalado",
+    "  • pymediainfo: pip install pymediainfo",
+    "\nFLUJO DE PROCESAMIENTO:",
+    "  1. Empaquetado a MKA (ffmpeg) → Contenedor con metadatos confiables",
+    "  2. Extracción de metadatos (pymediainfo) → Frame duration crítico",
+    "  3. Análisis de silencio (ffmpeg) → Directo sobre el MKA, estrategia 500ms→400ms→300ms",
+    "  4. Extracción de silencio (ffmpeg) → Alineado a frame boundaries",
+    "  5. Aplicación delay/target (ffmpeg) → Concatenación precisa",
+)) + "\n"
+
+def es_archivo_de_entrada(argumento):
+    """
+    True si un argumento posterior al primero es otro archivo del lote:
+    debe existir como archivo y no poder leerse como delay ni como target
+    """
+    if parsear_delay(argumento) is not None or parsear_target(argumento) is not None:
+        return False
+    return os.path.isfile(argumento)
+
 def main():
     if len(sys.argv) < 2:
-        print("Delay Fix v1.0.1 - Herramienta para análisis de audio y aplicación de delay")
-        print("="*70)
-        print("DESCRIPCIÓN:")
-        print("  Analiza silencios en audio y aplica delays precisos ajustados a frame boundaries")
-        print("  Permite target de duración exacta con alineación perfecta a frames")
-        print("\nMODO 1: Análisis de silencio (extrae segmento para delays positivos)")
-        print("  Uso: python delay_fix.py <archivo_de_audio>")
-        print("\nMODO 2: Aplicar delay (positivo o negativo)")
-        print("  Uso: python delay_fix.py <archivo_de_audio> <delay>")
-        print("\nMODO 3: Aplicar delay con target exacto")
-        print("  Uso: python delay_fix.py <archivo_de_audio> <delay> <target>")
-        print("  NOTA: Si delay=0, solo se aplica ajuste para target")
-        
-        print("\nFORMATOS DE DELAY (positivo o negativo):")
-        print("  2000       (2000 milisegundos)")
-        print("  2000ms     (2000 milisegundos)")
-        print("  2.0s       (2.0 segundos)")
-        print("  -2000      (-2000 milisegundos - corta inicio)")
-        print("  -2000ms    (-2000 milisegundos - corta inicio)")
-        print("  -2.0s      (-2.0 segundos - corta inicio)")
-        
-        print("\nFORMATOS DE TARGET (duración total deseada):")
-        print("  01:35:50     (1 hora, 35 minutos, 50 segundos)")
-        print("  1:35:50.500  (1 hora, 35 minutos, 50 segundos y 500ms)")
-        print("  35:50.500    (35 minutos, 50 segundos y 500ms)")
-        print("  50.500       (50 segundos y 500ms)")
-        print("  .500         (500 milisegundos)")
-        print("  1.5          (1.5 segundos = 1500ms)")
-        
-        print("\nEJEMPLOS PRÁCTICOS:")
-        print("  Analizar silencio:")
-        print("    python delay_fix.py audio.aac")
-        print("\n  Aplicar delay positivo (agrega 2 segundos de silencio):")
-        print("    python delay_fix.py audio.aac 2000")
-        print("\n  Aplicar delay negativo (corta 2 segundos del inicio):")
-        print("    python delay_fix.py audio.aac -2000")
-        print("\n  Ajustar duración total a 1:35:50 (con delay positivo):")
-        print("    python delay_fix.py audio.aac 2000 01:35:50")
-        print("\n  Solo ajustar duración total a 1:35:50 (delay=0):")
-        print("    python delay_fix.py audio.aac 0 01:35:50")
-        
-        print("\nNOTAS IMPORTANTES:")
-        print("  • Archivo final se guarda en el mismo directorio del archivo de entrada")
-        print("  • Archivos temporales se guardan en directorio temporal del sistema")
-        print("  • concat_list.txt se conserva en temporales para debugging")
-        print("  • Requiere: ffmpeg en PATH y pymediainfo instalado")
-        print("  • pymediainfo: pip install pymediainfo")
-        
-        print("\nFLUJO DE PROCESAMIENTO:")
-        print("  1. Empaquetado a MKA (ffmpeg) → Contenedor con metadatos confiables")
-        print("  2. Extracción de metadatos (pymediainfo) → Frame duration crítico")
-        print("  3. Conversión a WAV (ffmpeg) → Para análisis de silencio")
-        print("  4. Análisis de silencio (ffmpeg) → Estrategia 500ms→400ms→300ms")
-        print("  5. Extracción de silencio (ffmpeg) → Alineado a frame boundaries")
-        print("  6. Aplicación delay/target (ffmpeg) → Concatenación precisa")
+        sys.stdout.write(_AYUDA)
         return 1
     
-    input_file = sys.argv[1]
+    argumentos = sys.argv[1:]
+    
+    # --parallel N / -j N (modo lote), en cualquier posición
+    max_procesos = None
+    for opcion in ("--parallel", "-j"):
+        if opcion in argumentos:
+            i = argumentos.index(opcion)
+            valor = argumentos[i + 1] if i + 1 < len(argumentos) else ""
+            if not valor.isdecimal() or int(valor) < 1:
+                print(f"Error: {opcion} requiere un número de procesos (ej: {opcion} 4)")
+                return 1
+            max_procesos = int(valor)
+            del argumentos[i:i + 2]
     
-    if not os.path.exists(input_file):
-        print(f"Error: Archivo no encontrado: {input_file}")
+    if not argumentos:
+        sys.stdout.write(_AYUDA)
         return 1
     
-    try:
-        subprocess.run(["ffmpeg", "-version"], capture_output=True, check=True)
-    except:
-        print("Error: ffmpeg no encontrado")
-        print("  Instala FFmpeg para usar esta herramienta")
+    # Archivos de entrada: el primer argumento y los siguientes que existan
+    # como archivo y no sean un delay/target válido (un archivo llamado "2000"
+    # o "1:30" en el directorio actual no convierte el delay en entrada);
+    # lo que sigue son delay y target comunes a todos
+    n_archivos = 1
+    while n_archivos < len(argumentos) and es_archivo_de_entrada(argumentos[n_archivos]):
+        n_archivos += 1
+    archivos, args_extra = argumentos[:n_archivos], argumentos[n_archivos:]
+    
+    # Los siguientes ya se verificaron con isfile(); solo falta el primero
+    if not os.path.isfile(archivos[0]):
+        print(f"Error: Archivo no encontrado: {archivos[0]}")
         return 1
     
-    print(f"\n[Delay Fix v1.0.1]")
-    print(f"Archivo origen: {Path(input_file).name}")
+    # Delay sin target: un valor inválido o 0 no tiene nada que aplicar y se
+    # rechaza antes de preparar temporales o verificar ffmpeg
+    if len(args_extra) == 1:
+        delay_ms = parsear_delay(args_extra[0])
+        if delay_ms is None:
+            print(f"Error: No se pudo parsear el delay: '{args_extra[0]}'")
+            print(f"Formatos aceptados: 2000, 2000ms, 2.0s, 2.0, -2000ms, -2.0s")
+            return 1
+        if delay_ms == 0:
+            print(f"Error: Delay no puede ser 0 sin target")
+            print(f"Si desea solo ajustar al target, use: python delay_fix.py {archivos[0]} 0 <target>")
+            return 1
     
     temp_dir = Path(tempfile.gettempdir()) / "delay_fix"
     temp_dir.mkdir(exist_ok=True)
     
-    if len(sys.argv) == 4:
-        delay_str = sys.argv[2]
-        target_str = sys.argv[3]
+    if not ffmpeg_disponible(temp_dir):
+        print("Error: ffmpeg no encontrado")
+        print("  Instala FFmpeg para usar esta herramienta")
+        return 1
+    
+    if len(archivos) > 1:
+        return procesar_lote(archivos, args_extra, temp_dir, max_procesos)
+    
+    return procesar_archivo(archivos[0], args_extra, temp_dir)
+
+def _procesar_archivo_lote(indice, input_file, args_extra, temp_dir):
+    """
+    Worker del modo lote: procesa un archivo en su propio directorio temporal
+    (los nombres como concat_list.txt no chocan entre procesos) y retorna
+    (código de retorno, salida capturada)
+    """
+    from contextlib import redirect_stdout
+    import io
+    
+    temp_archivo = temp_dir / f"lote_{indice}"
+    temp_archivo.mkdir(exist_ok=True)
+    
+    salida = io.StringIO()
+    with redirect_stdout(salida):
+        try:
+            rc = procesar_archivo(input_file, args_extra, temp_archivo)
+        except Exception as e:
+            print(f"Error procesando {input_file}: {e}")
+            rc = 1
+    return rc, salida.getvalue()
+
+def cpus_disponibles():
+    """
+    Núcleos que este proceso puede usar realmente: respeta la afinidad
+    (taskset, cgroups/contenedores) donde existe; si no, os.cpu_count()
+    """
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0)) or 1
+    return os.cpu_count() or 1
+
+def procesar_lote(archivos, args_extra, temp_dir, max_procesos=None):
+    """
+    Procesa varios archivos en paralelo con los mismos delay/target
+    Cada archivo es independiente: un proceso por archivo, hasta la mitad
+    de los núcleos (cada ffmpeg ya usa más de un hilo) o max_procesos
+    """
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    
+    if max_procesos is None:
+        max_procesos = cpus_disponibles() // 2
+    max_workers = max(1, min(len(archivos), max_procesos))
+    
+    print(f"\n[Delay Fix v1.0.1 - Lote]")
+    print(f"Archivos: {len(archivos)} | Procesos en paralelo: {max_workers}")
+    
+    fallidos = []
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futuros = {
+            executor.submit(_procesar_archivo_lote, indice, input_file, args_extra, temp_dir): input_file
+            for indice, input_file in enumerate(archivos)
+        }
+        
+        for completados, futuro in enumerate(as_completed(futuros), 1):
+            input_file = futuros[futuro]
+            try:
+                rc, salida = futuro.result()
+            except Exception as e:
+                rc, salida = 1, f"Error procesando {input_file}: {e}\n"
+            
+            # La salida de cada archivo se imprime completa, sin intercalarse
+            sys.stdout.write(salida)
+            estado = "OK" if rc == 0 else "ERROR"
+            print(f"\n[{completados}/{len(archivos)}] {Path(input_file).name}: {estado}")
+            if rc != 0:
+                fallidos.append(input_file)
+    
+    print(f"\n{'='*60}")
+    print(f"LOTE COMPLETADO: {len(archivos) - len(fallidos)}/{len(archivos)} archivos correctos")
+    for input_file in fallidos:
+        print(f"  Error: {input_file}")
+    print(f"{'='*60}")
+    
+    return 1 if fallidos else 0
+
+def mover_archivo(origen, destino):
+    """
+    Mueve un archivo con un solo rename atómico (os.replace) cuando origen y
+    destino están en el mismo sistema de archivos; si no, shutil.move copia
+    """
+    try:
+        os.replace(origen, destino)
+    except OSError:
+        shutil.move(str(origen), str(destino))
+
+def procesar_archivo(input_file, args_extra, temp_dir):
+    """
+    Pipeline completo para un archivo
+    args_extra: [] (análisis), [delay] o [delay, target]
+    Los silencios en tmpfs de este archivo se eliminan siempre al terminar
+    """
+    try:
+        return _procesar_archivo(input_file, args_extra, temp_dir)
+    finally:
+        limpiar_silencios(temp_dir)
+
+def _procesar_archivo(input_file, args_extra, temp_dir):
+    """
+    Cuerpo de procesar_archivo
+    """
+    print(f"\n[Delay Fix v1.0.1]")
+    input_path = Path(input_file)
+    print(f"Archivo origen: {input_path.name}")
+    
+    if len(args_extra) == 2:
+        delay_str = args_extra[0]
+        target_str = args_extra[1]
         
         resultado, archivo_final = procesar_delay_con_target(input_file, delay_str, target_str, temp_dir)
         
@@ -1989,9 +2618,10 @@ def main():
             return 0
         else:
             # MODIFICACIÓN: Mover archivo final al directorio original
-            if archivo_final and archivo_final.exists():
-                destino_final = Path(input_file).parent / archivo_final.name
-                shutil.move(str(archivo_final), str(destino_final))
+            # (el pipeline solo retorna archivos ya verificados como existentes)
+            if archivo_final:
+                destino_final = input_path.parent / archivo_final.name
+                mover_archivo(archivo_final, destino_final)
                 archivo_final = destino_final
                 print(f"\n  Archivo final movido a directorio original: {destino_final}")
             
@@ -2038,14 +2668,11 @@ def main():
             print(f"{'='*60}")
             return 0
             
-    elif len(sys.argv) == 3:
-        delay_str = sys.argv[2]
+    elif len(args_extra) == 1:
+        delay_str = args_extra[0]
         
+        # main() ya rechazó un delay inválido o 0
         delay_ms = parsear_delay(delay_str)
-        if delay_ms == 0:
-            print(f"Error: Delay no puede ser 0 sin target")
-            print(f"Si desea solo ajustar al target, use: python delay_fix.py {input_file} 0 <target>")
-            return 1
         
         print(f"Modo: Aplicar delay sin target")
         print(f"Delay solicitado: {delay_str}")
@@ -2057,7 +2684,7 @@ def main():
         
         es_negativo = delay_ms < 0
         
-        nombre_base = Path(input_file).stem
+        nombre_base = input_path.stem
         mka_name = nombre_base + ".mka"
         mka_path = temp_dir / mka_name
         
@@ -2066,7 +2693,7 @@ def main():
             return 1
         
         print(f"\nPaso 2/5: Extrayendo metadatos con pymediainfo...")
-        metadatos = obtener_metadatos_mediainfo(mka_path)
+        metadatos = obtener_metadatos_mediainfo(mka_path, input_file)
         
         if metadatos['Frame_duration_ms'] is None:
             print(f"\n{'='*60}")
@@ -2096,50 +2723,46 @@ def main():
             archivo_final = archivo_delay
             resultado = "negativo"
         else:
-            print(f"\nPaso 3/5: Creando archivo base de silencio...")
-            
-            wav_path = convertir_mka_a_wav(mka_path, temp_dir)
-            if not wav_path:
-                print(f"Error: No se pudo crear archivo WAV")
-                return 1
-            
-            resultado_silencios = analizar_silencios_wav(wav_path, frame_duration_ms)
-            if not resultado_silencios:
-                print(f"Error: No se encontraron silencios adecuados")
-                return 1
-            
-            archivo_silencio = extraer_silencio_del_mka(mka_path, resultado_silencios, temp_dir)
-            if not archivo_silencio:
-                return 1
-            
-            silencio_base_path = archivo_silencio
-            duracion_silencio_ms = resultado_silencios['duracion_ajustada_ms']
-            
-            print(f"\nPaso 4/5: Creando segmentos para delay de {abs(delay_ms):.2f} ms...")
-            
-            segmentos, delay_real_ms = crear_segmentos_delay(
-                silencio_base_path, abs(delay_ms), frame_duration_ms, 
-                duracion_silencio_ms, temp_dir, "_delay"
+            # PCM: delay en una sola pasada, sin silencio base ni concat
+            archivo_final, _, _ = aplicar_delay_pcm(
+                mka_path, delay_ms, 0, frame_duration_ms, temp_dir / f"{nombre_base}_delay.mka"
             )
             
-            if not segmentos:
-                return 1
-            
-            print(f"\nPaso 5/5: Concatenando segmentos...")
-            
-            archivo_final_path = temp_dir / f"{nombre_base}_delay.mka"
-            archivos_concatenar = segmentos + [mka_path]
-            
-            archivo_final = concatenar_con_ffmpeg(archivos_concatenar, archivo_final_path, temp_dir)
             if not archivo_final:
-                return 1
+                print(f"\nPaso 3/5: Creando archivo base de silencio...")
+                
+                silencio_base_path, duracion_silencio_ms = crear_silencio_base(
+                    mka_path, frame_duration_ms, temp_dir, origen=input_file
+                )
+                if not silencio_base_path:
+                    return 1
+                
+                print(f"\nPaso 4/5: Creando segmentos para delay de {abs(delay_ms):.2f} ms...")
+                
+                segmentos, delay_real_ms = crear_segmentos_delay(
+                    silencio_base_path, abs(delay_ms), frame_duration_ms, 
+                    duracion_silencio_ms, temp_dir, "_delay"
+                )
+                
+                if not segmentos:
+                    return 1
+                
+                print(f"\nPaso 5/5: Concatenando segmentos...")
+                
+                archivo_final_path = temp_dir / f"{nombre_base}_delay.mka"
+                archivos_concatenar = segmentos + [mka_path]
+                
+                archivo_final = concatenar_con_ffmpeg(archivos_concatenar, archivo_final_path, temp_dir)
+                if not archivo_final:
+                    return 1
             
             resultado = "positivo"
         
         # MODIFICACIÓN: Mover archivo final al directorio original
-        if archivo_final and archivo_final.exists():
-            destino_final = Path(input_file).parent / archivo_final.name
-            shutil.move(str(archivo_final), str(destino_final))
+        # (el pipeline solo retorna archivos ya verificados como existentes)
+        if archivo_final:
+            destino_final = input_path.parent / archivo_final.name
+            mover_archivo(archivo_final, destino_final)
             archivo_final = destino_final
             print(f"\n  Archivo final movido a directorio original: {destino_final}")
         
@@ -2159,25 +2782,26 @@ def main():
         return 0
             
     else:
-        print(f"Objetivo: Empaquetar a MKA → Extraer metadatos → Convertir a WAV → Analizar silencios → Extraer silencio")
+        print(f"Objetivo: Empaquetar a MKA → Extraer metadatos → Analizar silencios → Extraer silencio")
         print("-" * 60)
         
-        nombre_base = Path(input_file).stem
+        nombre_base = input_path.stem
         mka_name = nombre_base + ".mka"
         mka_path = temp_dir / mka_name
         
-        print(f"Paso 1/5: Creando contenedor MKA con ffmpeg...")
+        print(f"Paso 1/4: Creando contenedor MKA con ffmpeg...")
         
         if not crear_mka_con_ffmpeg(input_file, mka_path):
             return 1
         
-        print(f"Paso 2/5: Extrayendo metadatos confiables con pymediainfo...")
+        print(f"Paso 2/4: Extrayendo metadatos confiables con pymediainfo...")
         
-        if not mka_path.exists():
+        st_mka = _stat_o_none(mka_path)
+        if not st_mka:
             print(f"Error: Archivo MKA no se creó correctamente")
             return 1
         
-        metadatos = obtener_metadatos_mediainfo(mka_path)
+        metadatos = obtener_metadatos_mediainfo(mka_path, input_file)
         
         if metadatos['Frame_duration_ms'] is None:
             print(f"\n{'='*60}")
@@ -2192,18 +2816,13 @@ def main():
         frame_duration_ms = metadatos['Frame_duration_ms']
         print(f"  Frame duration: {frame_duration_ms:.4f} ms")
         
-        wav_path = convertir_mka_a_wav(mka_path, temp_dir)
-        
-        if not wav_path:
-            print(f"Error: No se pudo crear archivo WAV para análisis")
-            return 1
-        
-        resultado_silencios = analizar_silencios_wav(
-            wav_path, 
-            metadatos['Frame_duration_ms']
+        resultado_silencios = analizar_silencios(
+            mka_path, 
+            metadatos['Frame_duration_ms'],
+            input_file
         )
         
-        mostrar_resultado_silencios(resultado_silencios, Path(input_file).name)
+        mostrar_resultado_silencios(resultado_silencios, input_path.name)
         
         archivo_silencio = extraer_silencio_del_mka(
             mka_path, 
@@ -2216,14 +2835,9 @@ def main():
         print(f"{'='*60}")
         print(f"1. MKA (metadatos confiables):")
         print(f"   {mka_path.name}")
-        print(f"   Tamaño: {mka_path.stat().st_size:,} bytes")
-        
-        print(f"\n2. WAV (análisis de silencio):")
-        print(f"   {wav_path.name}")
-        print(f"   Tamaño: {wav_path.stat().st_size:,} bytes")
-        print(f"   Formato: PCM S16LE Mono (16-bit, 1 canal)")
+        print(f"   Tamaño: {st_mka.st_size:,} bytes")
         
-        print(f"\n3. ANÁLISIS DE SILENCIOS:")
+        print(f"\n2. ANÁLISIS DE SILENCIOS (sobre el MKA, PCM S16LE mono en memoria):")
         if resultado_silencios:
             print(f"   Encontrado a {resultado_silencios['umbral_detectado_db']} dB")
             print(f"   Duración original: {resultado_silencios['duracion_original_ms']:.1f} ms")